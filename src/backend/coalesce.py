@@ -0,0 +1,28 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# Request coalescing for expensive fan-out endpoints: while a computation for
+# a key is running, concurrent callers for the same key await its result
+# instead of starting their own. Per process; nothing is cached afterwards.
+
+_inflight: Dict[Hashable, asyncio.Future] = {}
+
+def _finish(key: Hashable, task: asyncio.Future) -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    # Mark the exception retrieved so it isn't reported when nobody was waiting
+    if not task.cancelled():
+        task.exception()
+
+async def coalesced(key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+    """Run compute() for key, or join the run already in flight for it"""
+    task = _inflight.get(key)
+    if task is None:
+        # Its own task, so cancelling the caller that started it doesn't
+        # cancel the run the other callers are waiting on
+        task = asyncio.ensure_future(compute())
+        _inflight[key] = task
+        task.add_done_callback(functools.partial(_finish, key))
+    # Shield so a cancelled caller only stops waiting
+    return await asyncio.shield(task)
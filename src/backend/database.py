@@ -1,7 +1,8 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
+import orjson
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -10,20 +11,80 @@ load_dotenv()
 # Database URL from environment or default to SQLite for development
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./agiletrack.db")
 
-engine = create_engine(DATABASE_URL)
+# JSON columns (Integration.config, Metric.raw_data) are encoded with orjson
+def _json_serializer(value):
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+
+# Shared engine options; the compiled-statement cache is sized above the
+# default 500 so the routers' queries stay cached
+ENGINE_OPTIONS = {
+    "json_serializer": _json_serializer,
+    "json_deserializer": orjson.loads,
+    "query_cache_size": 1200,
+}
+
+if DATABASE_URL.startswith("sqlite"):
+    # SQLite connections are shared across FastAPI's threadpool
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False}, **ENGINE_OPTIONS)
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+else:
+    # Size the pool for concurrent requests, and replace stale connections
+    # instead of handing them out. Recycle well inside the hourly beat interval,
+    # so Celery workers idle between syncs don't start on a server-closed connection
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "40")),
+        pool_timeout=30,
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        pool_pre_ping=True,
+        **ENGINE_OPTIONS,
+    )
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Context manager for a DB session, rolling back on error and always closing
+class SessionManager:
+    def __enter__(self):
+        self.db = SessionLocal()
+        return self.db
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.db.rollback()
+        self.db.close()
+        return False
+
+# Hand a session's pooled connection back while keeping what it loaded: the
+# objects are detached with their loaded attributes intact (nothing is
+# expired), then the read-only transaction is ended. Use before awaiting
+# slow external I/O that doesn't need the database.
+def release_connection(db):
+    db.expunge_all()
+    db.rollback()
+
 # Dependency to get DB session
 def get_db():
-    db = SessionLocal()
-    try:
+    with SessionManager() as db:
         yield db
-    finally:
-        db.close()
+
+# Set once the tables have been created in this process
+_db_initialized = False
 
 # Function to initialize database
 def init_db():
+    global _db_initialized
+    # create_all checks every table first, so only run it once per process
+    if _db_initialized:
+        return
+    
     # Import all models here to ensure they are registered with Base
     from src.models.user import User
     from src.models.team import Team
@@ -32,4 +93,11 @@ def init_db():
     from src.models.project import Project
     
     # Create all tables
-    Base.metadata.create_all(bind=engine) 
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    _db_initialized = True
+
+if __name__ == "__main__":
+    # Run via the package module so the models register on the same Base
+    from src.backend.database import init_db as package_init_db
+    package_init_db()
+ 
\ No newline at end of file
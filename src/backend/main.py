@@ -1,5 +1,10 @@
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+import logging
+import queue
 import uvicorn
 import os
 from dotenv import load_dotenv
@@ -7,6 +12,14 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Configure logging: handlers only enqueue records, and a background
+# listener thread does the actual (blocking) stream writes
+log_queue = queue.SimpleQueue()
+log_stream_handler = logging.StreamHandler()
+log_stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+log_listener = QueueListener(log_queue, log_stream_handler)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), handlers=[QueueHandler(log_queue)])
+
 # Import database
 from src.backend.database import engine, Base, init_db
 
@@ -23,23 +36,41 @@ from src.backend.routes import projects, integrations, auth, teams
 # Import Celery tasks
 from src.backend.tasks import app as celery_app
 
-# Initialize database
-init_db()
+# Initialize database (set INIT_DB_ON_STARTUP=0 when the schema is managed separately)
+if os.getenv("INIT_DB_ON_STARTUP", "1") == "1":
+    init_db()
+
+# Run one-off startup work once per process
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_listener.start()
+    # Seed the demo admin user only when explicitly enabled (dev/docker)
+    if os.getenv("CREATE_DEMO_ADMIN") == "1":
+        auth.create_demo_admin()
+    yield
+    log_listener.stop()
 
 # Create FastAPI app
-app = FastAPI(title="AgileTrack API", description="API for tracking agile metrics across multiple platforms")
+app = FastAPI(
+    title="AgileTrack API",
+    description="API for tracking agile metrics across multiple platforms",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 # Add CORS middleware with specific configuration
-origins = [
+# A frozenset makes the per-request origin check a hash lookup; with
+# allow_credentials=True the list must stay explicit (no "*")
+ORIGINS = frozenset((
     "http://localhost",  # Frontend origin
     "http://localhost:3000",  # Alternative frontend port
     "http://127.0.0.1",
     "http://127.0.0.1:3000"
-]
+))
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=origins,
+    allow_origins=ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -64,4 +95,5 @@ async def health_check():
 
 # Run the application
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    # Only pay for the reload file watcher in development
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=os.getenv("ENV") == "dev") 
\ No newline at end of file
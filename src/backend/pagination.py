@@ -0,0 +1,51 @@
+from fastapi import HTTPException
+from sqlalchemy import func, select, text
+import base64
+import binascii
+
+from src.integrations.cache import get_cached_json, set_cached_json
+
+# Keyset pagination cursors shared by the list endpoints. A cursor is the
+# last seen primary key, base64url-encoded so clients treat it as opaque.
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the last seen row ID as an opaque page cursor"""
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode()
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a page cursor back into the last seen row ID"""
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+# Listing totals are cached briefly; below this many rows (by the planner's
+# estimate) an exact COUNT(*) is cheap enough to run instead
+COUNT_CACHE_TTL_SECONDS = 30
+EXACT_COUNT_THRESHOLD = 10000
+
+def count_cache_key(model) -> str:
+    """Cache key for a table's listing total; drop it when rows are added"""
+    return f"{model.__tablename__}:count"
+
+def get_table_count(db, model) -> int:
+    """Total rows in model's table, cached briefly and estimated on large Postgres tables"""
+    cache_key = count_cache_key(model)
+    cached_count = get_cached_json(cache_key)
+    if cached_count is not None:
+        return cached_count
+    
+    count = None
+    if db.get_bind().dialect.name == "postgresql":
+        # reltuples is maintained by VACUUM/ANALYZE; it is -1 until the table has been analyzed
+        estimate = db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table"),
+            {"table": model.__tablename__}
+        ).scalar()
+        if estimate is not None and estimate >= EXACT_COUNT_THRESHOLD:
+            count = estimate
+    if count is None:
+        count = db.scalar(select(func.count()).select_from(model))
+    
+    set_cached_json(cache_key, count, COUNT_CACHE_TTL_SECONDS)
+    return count
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from sqlalchemy import exists
 from datetime import timedelta
 from typing import List
 import logging
 
-from src.backend.database import get_db, SessionLocal
+from src.backend.database import get_db, SessionManager
 from src.backend.auth import (
     authenticate_user, 
     create_access_token, 
@@ -16,6 +17,8 @@ from src.backend.auth import (
 from src.models.user import User
 from src.models.schemas import UserCreate, User as UserSchema, UserLogin, Token, UserSetup
 
+logger = logging.getLogger(__name__)
+
 # Create router
 router = APIRouter(
     prefix="/auth",
@@ -25,22 +28,22 @@ router = APIRouter(
 
 # Register new user
 @router.post("/register", response_model=UserSchema, status_code=status.HTTP_201_CREATED)
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    print(f"Registration attempt with email: {user.email}, username: {user.username}")
+def register_user(user: UserCreate, db: Session = Depends(get_db)):
+    logger.debug("Registration attempt with email: %s, username: %s", user.email, user.username)
     
-    # Check if email already exists
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if db_user:
-        print(f"Registration failed: Email {user.email} already exists")
+    # Check if email or username already exists with a single EXISTS round trip
+    email_taken, username_taken = db.query(
+        exists().where(User.email == user.email),
+        exists().where(User.username == user.username)
+    ).one()
+    if email_taken:
+        logger.debug("Registration failed: Email %s already exists", user.email)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    
-    # Check if username already exists
-    db_username = db.query(User).filter(User.username == user.username).first()
-    if db_username:
-        print(f"Registration failed: Username {user.username} already exists")
+    if username_taken:
+        logger.debug("Registration failed: Username %s already exists", user.username)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
@@ -63,7 +66,7 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
 
 # Login for access token
 @router.post("/token", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     user = authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
@@ -81,7 +84,7 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
 
 # Login (custom endpoint that accepts email instead of username)
 @router.post("/login", response_model=Token)
-async def login(user_data: UserLogin, db: Session = Depends(get_db)):
+def login(user_data: UserLogin, db: Session = Depends(get_db)):
     user = authenticate_user(db, user_data.email, user_data.password)
     if not user:
         raise HTTPException(
@@ -104,7 +107,7 @@ async def read_users_me(current_user: User = Depends(get_current_active_user)):
 
 # Update user setup information
 @router.put("/setup", response_model=UserSchema)
-async def update_user_setup(
+def update_user_setup(
     setup_data: UserSetup, 
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -123,7 +126,7 @@ async def update_user_setup(
 
 # Mark user as having integrations
 @router.put("/has-integration", response_model=UserSchema)
-async def update_integration_status(
+def update_integration_status(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -133,31 +136,26 @@ async def update_integration_status(
     
     return current_user
 
-# Create a demo admin user on startup
+# Create a demo admin user (run once per process from the app lifespan)
 def create_demo_admin():
-    db = SessionLocal()
     try:
-        # Check if admin user already exists
-        admin = db.query(User).filter(User.email == "admin@example.com").first()
-        if not admin:
-            # Create admin user
-            hashed_password = get_password_hash("adminpassword")
-            admin_user = User(
-                email="admin@example.com",
-                username="admin",
-                hashed_password=hashed_password,
-                full_name="Admin User",
-                setup_complete=True,
-                has_integration=True,
-                is_active=True
-            )
-            db.add(admin_user)
-            db.commit()
-            print("Demo admin user created with email: admin@example.com and password: adminpassword")
+        with SessionManager() as db:
+            # Check if admin user already exists
+            admin_exists = db.query(exists().where(User.email == "admin@example.com")).scalar()
+            if not admin_exists:
+                # Create admin user
+                hashed_password = get_password_hash("adminpassword")
+                admin_user = User(
+                    email="admin@example.com",
+                    username="admin",
+                    hashed_password=hashed_password,
+                    full_name="Admin User",
+                    setup_complete=True,
+                    has_integration=True,
+                    is_active=True
+                )
+                db.add(admin_user)
+                db.commit()
+                logger.info("Demo admin user created with email: admin@example.com and password: adminpassword")
     except Exception as e:
-        print(f"Error creating admin user: {e}")
-    finally:
-        db.close()
-
-# Create admin user on module import
-create_demo_admin() 
\ No newline at end of file
+        logger.error("Error creating admin user: %s", e)
\ No newline at end of file
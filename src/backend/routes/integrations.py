@@ -1,21 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any, Optional, Union
-from pydantic import BaseModel, field_serializer
+from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+from sqlalchemy import delete, exists, insert, select, update
 from sqlalchemy.sql import func
 from datetime import datetime
+import asyncio
+import logging
+import orjson
 
 from src.backend.database import get_db
+from src.backend.pagination import encode_cursor, decode_cursor
 from src.models.integration import Integration
 from src.models.project import Project
 from src.integrations.integration_factory import IntegrationFactory
 from src.integrations.trello_integration import TrelloIntegration
 from src.integrations.github_integration import GitHubIntegration
-from src.backend.tasks import initial_sync_metrics_task # Import the Celery task
-from src.models.metric import Metric
+from src.backend.tasks import initial_sync_metrics_task, initial_sync_metrics_batch_task, store_metrics_task, save_metrics # Import the Celery tasks
+from src.integrations.cache import get_cached_json, set_cached_json, set_cached_json_many, invalidate_cache_prefix
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/integrations", tags=["integrations"])
 
+# Response cache settings for the read endpoints
+CACHE_PREFIX = "integrations:"
+LIST_CACHE_PREFIX = f"{CACHE_PREFIX}list:"
+LIST_CACHE_TTL_SECONDS = 30
+METRICS_CACHE_TTL_SECONDS = 300
+# Team metrics aggregates are built from integration metrics, so integration
+# updates/deletes drop them as well
+TEAM_METRICS_CACHE_PREFIX = "teams:metrics:"
+# Most integrations fetched concurrently by one project/team metrics request
+METRICS_FETCH_CONCURRENCY = 8
+
+# The supported types and their metric descriptions never change at runtime,
+# so their JSON bodies are encoded once at import
+SUPPORTED_INTEGRATION_TYPES = ["github", "jira", "trello"]
+STATIC_CACHE_CONTROL = {"Cache-Control": "public, max-age=3600, immutable"}
+_TYPES_JSON = orjson.dumps(SUPPORTED_INTEGRATION_TYPES)
+_TYPE_METRICS_JSON = {
+    integration_type: orjson.dumps(IntegrationFactory.get_supported_metrics(integration_type))
+    for integration_type in SUPPORTED_INTEGRATION_TYPES
+}
+
 # Pydantic models for request/response
 class IntegrationBase(BaseModel):
     name: str
@@ -40,24 +69,16 @@ class IntegrationUpdate(BaseModel):
 class IntegrationResponse(IntegrationBase):
     id: int
     active: bool
-    last_sync: Optional[Union[str, datetime]] = None
-    
-    @field_serializer('last_sync')
-    def serialize_dt(self, dt: Optional[Union[str, datetime]], _info):
-        if dt is None:
-            return None
-        if isinstance(dt, str):
-            return dt
-        return dt.isoformat()
+    # Serialized to ISO 8601 by pydantic-core itself, no per-row Python callback
+    last_sync: Optional[datetime] = None
     
-    class Config:
-        orm_mode = True
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # New Pydantic model for paginated response
 class PaginatedIntegrationsResponse(BaseModel):
-    total_count: int
     items: List[IntegrationResponse]
+    next_cursor: Optional[str] = None
+    total_count: Optional[int] = None
         
 class MetricsRequest(BaseModel):
     days: Optional[int] = 30
@@ -86,86 +107,290 @@ class RepositoriesResponse(BaseModel):
 class BoardsResponse(BaseModel):
     boards: List[Dict[str, Any]]
 
+INTEGRATION_RESPONSE_FIELDS = tuple(IntegrationResponse.model_fields)
+# Format last_sync exactly as the pydantic-validated endpoints do ("Z" for UTC)
+LAST_SYNC_ADAPTER = TypeAdapter(Optional[datetime])
+
+def integration_to_dict(integration: Integration) -> Dict[str, Any]:
+    """Serialize an integration row to the IntegrationResponse shape"""
+    data = {field: getattr(integration, field) for field in INTEGRATION_RESPONSE_FIELDS}
+    data["last_sync"] = LAST_SYNC_ADAPTER.dump_python(data["last_sync"], mode="json")
+    return data
+
+def get_client_config(integration: Integration) -> Dict[str, Any]:
+    """Build the IntegrationFactory config for an integration row"""
+    cfg = integration.config or {}
+    return {
+        "api_token": integration.api_key,
+        "server": integration.api_url,
+        "username": integration.username,
+        "repository": cfg.get("repository"),
+        "api_key": integration.api_key if integration.type == "trello" else cfg.get("api_key"),
+        "api_secret": cfg.get("api_secret"),
+        "token": cfg.get("token")
+    }
+
+# Per-type check for the parameter get_metrics needs, and the error to report if it is missing
+REQUIRED_METRICS_PARAMS = {
+    "github": (
+        lambda integration, request: (integration.config or {}).get("repository"),
+        "Repository name not configured. Please edit the integration to add a repository."
+    ),
+    "jira": (
+        lambda integration, request: request.project_key,
+        "Project key not provided. Please specify a project_key in your request."
+    ),
+    "trello": (
+        lambda integration, request: request.board_id,
+        "Board ID not provided. Please specify a board_id in your request."
+    ),
+}
+
+# Type-specific MetricsRequest parameters taken from an integration's config.
+# Types are stored lowercased, so rows can be dispatched without .lower()
+METRICS_REQUEST_PARAMS = {
+    "jira": lambda config: {"project_key": config.get("project_key")},
+    "trello": lambda config: {"board_id": config.get("board_id")},
+}
+
+def build_metrics_request(integration: Integration, days: int = 30) -> MetricsRequest:
+    """MetricsRequest for an integration's configured project/board, as used by the dashboard fan-outs"""
+    extractor = METRICS_REQUEST_PARAMS.get(integration.type)
+    params = extractor(integration.config or {}) if extractor else {}
+    for name, value in params.items():
+        if not value:
+            logger.warning("%s not found in config for %s integration %s; metrics may be incomplete", name, integration.type, integration.id)
+    return MetricsRequest(days=days, **params)
+
+def metrics_response(integration: Integration, metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """Wrap metrics (or an error) in the MetricsResponse envelope"""
+    return {
+        "integration_id": integration.id,
+        "integration_name": integration.name,
+        "integration_type": integration.type,
+        "metrics": metrics
+    }
+
+def is_cacheable_metrics_response(response: Any) -> bool:
+    """Don't cache provider or configuration errors, so the next request retries"""
+    return isinstance(response, dict) and not response["metrics"].get("error")
+
+def metrics_cache_prefix(integration_id: int) -> str:
+    """Prefix shared by every cached metrics result for one integration"""
+    return f"{CACHE_PREFIX}metrics:{integration_id}:"
+
+def metrics_cache_key(integration_id: int, metrics_request: MetricsRequest) -> str:
+    """Cache key for one integration's metrics response under the given request parameters"""
+    return (
+        f"{metrics_cache_prefix(integration_id)}days={metrics_request.days}"
+        f":project_key={metrics_request.project_key}:board_id={metrics_request.board_id}"
+    )
+
+def invalidate_integration_cache(integration_id: int) -> None:
+    """Drop cached list pages, this integration's cached metrics and the team aggregates built on them"""
+    invalidate_cache_prefix(LIST_CACHE_PREFIX)
+    invalidate_cache_prefix(metrics_cache_prefix(integration_id))
+    invalidate_cache_prefix(TEAM_METRICS_CACHE_PREFIX)
+
 # Routes
 @router.get("/", response_model=PaginatedIntegrationsResponse)
-async def get_integrations(
+def get_integrations(
     db: Session = Depends(get_db), 
-    skip: int = Query(0, ge=0, description="Number of items to skip"), 
-    limit: int = Query(100, ge=1, le=200, description="Number of items to return per page (max 200)")
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    skip: int = Query(0, ge=0, description="Number of items to skip (ignored when a cursor is given)"), 
+    limit: int = Query(100, ge=1, le=200, description="Number of items to return per page (max 200)"),
+    include_total: bool = Query(False, description="Also return the total number of integrations")
 ):
-    """Get all integrations with pagination"""
-    total_count = db.query(func.count(Integration.id)).scalar()
-    integrations = db.query(Integration).offset(skip).limit(limit).all()
-    return PaginatedIntegrationsResponse(total_count=total_count, items=integrations)
+    """Get all integrations with keyset pagination"""
+    cache_key = f"{LIST_CACHE_PREFIX}cursor={cursor}:skip={skip}:limit={limit}:total={include_total}"
+    cached_response = get_cached_json(cache_key)
+    if cached_response is not None:
+        return ORJSONResponse(cached_response)
+    
+    # Without a cursor the WHERE clause is unfiltered, so a COUNT(*) OVER ()
+    # window gives the table total in the same pass as the page rows
+    windowed_total = include_total and cursor is None
+    entities = [Integration, func.count().over().label("total")] if windowed_total else [Integration]
+    
+    stmt = select(*entities).order_by(Integration.id)
+    if cursor is not None:
+        # Seek past the last seen ID on the primary key index instead of OFFSET
+        stmt = stmt.where(Integration.id > decode_cursor(cursor))
+    elif skip:
+        stmt = stmt.offset(skip)
+    # Fetch one extra row to know whether there is a next page
+    rows = db.execute(stmt.limit(limit + 1)).all()
+    
+    integrations = [row.Integration for row in rows]
+    total_count = rows[0].total if windowed_total and rows else None
+    
+    next_cursor = None
+    if len(integrations) > limit:
+        integrations = integrations[:limit]
+        next_cursor = encode_cursor(integrations[-1].id)
+    
+    if include_total and total_count is None:
+        # Cursor pages (or a skip past the end) still need a separate count
+        total_count = db.scalar(select(func.count(Integration.id)))
+    
+    # Rows come straight from the DB, so build the response body directly and
+    # return it as-is rather than validating every item through pydantic
+    response = {
+        "items": [integration_to_dict(integration) for integration in integrations],
+        "next_cursor": next_cursor,
+        "total_count": total_count
+    }
+    set_cached_json(cache_key, response, LIST_CACHE_TTL_SECONDS)
+    return ORJSONResponse(response)
 
 @router.post("/", response_model=IntegrationResponse, status_code=status.HTTP_201_CREATED)
-async def create_integration(integration: IntegrationCreate, db: Session = Depends(get_db)):
+def create_integration(integration: IntegrationCreate, db: Session = Depends(get_db)):
     """Create a new integration"""
-    # Validate the integration type
-    try:
-        IntegrationFactory.get_supported_metrics(integration.type)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    # Validate the integration type against the precomputed table
+    if integration.type.lower() not in _TYPE_METRICS_JSON:
+        raise HTTPException(status_code=400, detail=f"Unsupported integration type: {integration.type}")
     
     # Check if project exists, if not create a default project
     project_id = integration.project_id
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project_exists = db.scalar(select(exists().where(Project.id == project_id)))
     
-    if not project:
+    if not project_exists:
         # Create a default project if not found
         default_project = Project(
             name="Default Project",
             description="Default project created automatically"
         )
         db.add(default_project)
-        db.commit()
-        db.refresh(default_project)
+        # Flush for the ID; it commits together with the integration below
+        db.flush()
         project_id = default_project.id
-        print(f"Created default project with ID: {project_id}")
+        logger.debug("Created default project with ID: %s", project_id)
     
     # Use team_id from request or default to project_id
     team_id = integration.team_id or project_id
-    print(f"Creating integration with team_id: {team_id}, project_id: {project_id}")
-    
-    # Create new integration in DB
-    db_integration = Integration(
-        name=integration.name,
-        type=integration.type,
-        api_key=integration.api_key,
-        api_url=integration.api_url,
-        username=integration.username,
-        config=integration.config,
-        project_id=project_id,
-        team_id=team_id,
-        active=True
-    )
+    logger.debug("Creating integration with team_id: %s, project_id: %s", team_id, project_id)
     
     try:
-        db.add(db_integration)
+        # Create new integration in DB; INSERT ... RETURNING avoids a refresh SELECT
+        db_integration = db.execute(
+            insert(Integration)
+            .values(
+                name=integration.name,
+                type=integration.type.lower(),
+                api_key=integration.api_key,
+                api_url=integration.api_url,
+                username=integration.username,
+                config=integration.config,
+                project_id=project_id,
+                team_id=team_id,
+                active=True
+            )
+            .returning(Integration)
+        ).scalar_one()
+        
+        # Serialize before commit expires the returned row
+        response = IntegrationResponse.model_validate(db_integration)
         db.commit()
-        db.refresh(db_integration)
+        # A new integration has no cached metrics yet, only the list pages are stale
+        invalidate_cache_prefix(LIST_CACHE_PREFIX)
         
         # Trigger initial metrics sync asynchronously using Celery
         try:
-            print(f"Queueing initial metrics sync task for integration {db_integration.id}")
-            initial_sync_metrics_task.delay(db_integration.id)
-            print(f"Successfully queued Celery task for integration {db_integration.id}")
+            logger.debug("Queueing initial metrics sync task for integration %s", response.id)
+            initial_sync_metrics_task.delay(response.id)
+            logger.debug("Successfully queued Celery task for integration %s", response.id)
         except Exception as e:
             # Log the error but don't let it fail the integration creation
-            print(f"Error queueing Celery task for initial metrics sync for integration {db_integration.id}: {str(e)}")
+            logger.error("Error queueing Celery task for initial metrics sync for integration %s: %s", response.id, e)
             # Depending on policy, you might want to raise an alert here or handle it more actively.
             # For now, the integration is created, but sync might need manual trigger or await a periodic job.
 
-        return db_integration
+        return response
     except Exception as e:
         db.rollback()
-        print(f"Error creating integration: {str(e)}")
+        logger.error("Error creating integration: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to create integration: {str(e)}")
 
+@router.post("/bulk", response_model=List[IntegrationResponse], status_code=status.HTTP_201_CREATED)
+def create_integrations_bulk(integrations: List[IntegrationCreate], db: Session = Depends(get_db)):
+    """Create several integrations with one INSERT and one Celery sync task"""
+    if not integrations:
+        return []
+    
+    for integration in integrations:
+        if integration.type.lower() not in _TYPE_METRICS_JSON:
+            raise HTTPException(status_code=400, detail=f"Unsupported integration type: {integration.type}")
+    
+    # Same default-project fallback as create_integration, resolved for the whole batch
+    requested_project_ids = {integration.project_id for integration in integrations}
+    existing_project_ids = set(db.scalars(select(Project.id).where(Project.id.in_(requested_project_ids))))
+    default_project_id = None
+    if requested_project_ids - existing_project_ids:
+        default_project = Project(
+            name="Default Project",
+            description="Default project created automatically"
+        )
+        db.add(default_project)
+        db.flush()
+        default_project_id = default_project.id
+        logger.debug("Created default project with ID: %s", default_project_id)
+    
+    rows = []
+    for integration in integrations:
+        project_id = integration.project_id if integration.project_id in existing_project_ids else default_project_id
+        rows.append({
+            "name": integration.name,
+            "type": integration.type.lower(),
+            "api_key": integration.api_key,
+            "api_url": integration.api_url,
+            "username": integration.username,
+            "config": integration.config,
+            "project_id": project_id,
+            "team_id": integration.team_id or project_id,
+            "active": True
+        })
+    
+    try:
+        # Multi-row INSERT ... RETURNING, serialized before commit expires the rows
+        db_integrations = db.scalars(insert(Integration).returning(Integration), rows).all()
+        response = [IntegrationResponse.model_validate(db_integration) for db_integration in db_integrations]
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("Error bulk creating integrations: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to create integrations: {str(e)}")
+    
+    invalidate_cache_prefix(LIST_CACHE_PREFIX)
+    
+    # One broker message for the whole batch instead of one per integration
+    integration_ids = [integration.id for integration in response]
+    try:
+        initial_sync_metrics_batch_task.delay(integration_ids)
+    except Exception as e:
+        logger.error("Error queueing initial metrics sync for integrations %s: %s", integration_ids, e)
+    
+    return response
+
+@router.get("/types", response_model=List[str])
+async def get_integration_types():
+    """Get supported integration types"""
+    return Response(_TYPES_JSON, media_type="application/json", headers=STATIC_CACHE_CONTROL)
+
+@router.get("/types/{integration_type}/metrics", response_model=Dict[str, str])
+async def get_integration_metrics(integration_type: str):
+    """Get supported metrics for an integration type"""
+    body = _TYPE_METRICS_JSON.get(integration_type.lower())
+    if body is not None:
+        return Response(body, media_type="application/json", headers=STATIC_CACHE_CONTROL)
+    try:
+        return IntegrationFactory.get_supported_metrics(integration_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/{integration_id}", response_model=IntegrationResponse)
-async def get_integration(integration_id: int, db: Session = Depends(get_db)):
+def get_integration(integration_id: int, db: Session = Depends(get_db)):
     """Get integration by ID"""
-    integration = db.query(Integration).filter(Integration.id == integration_id).first()
+    integration = db.get(Integration, integration_id)
     
     if integration is None:
         raise HTTPException(status_code=404, detail="Integration not found")
@@ -173,65 +398,72 @@ async def get_integration(integration_id: int, db: Session = Depends(get_db)):
     return integration
 
 @router.put("/{integration_id}", response_model=IntegrationResponse)
-async def update_integration(
+def update_integration(
     integration_id: int, 
     integration_update: IntegrationUpdate, 
     db: Session = Depends(get_db)
 ):
     """Update an integration"""
-    db_integration = db.query(Integration).filter(Integration.id == integration_id).first()
+    # For config, we want to completely replace it rather than update it
+    # This ensures old fields are removed when switching integration types
+    update_data = integration_update.model_dump(exclude_unset=True)
+    if update_data.get("type"):
+        update_data["type"] = update_data["type"].lower()
+    
+    if not update_data:
+        db_integration = db.get(Integration, integration_id)
+        if db_integration is None:
+            raise HTTPException(status_code=404, detail="Integration not found")
+        return db_integration
+    
+    # Single UPDATE ... RETURNING instead of SELECT + per-field setattr + UPDATE
+    db_integration = db.execute(
+        update(Integration)
+        .where(Integration.id == integration_id)
+        .values(**update_data)
+        .returning(Integration)
+    ).scalar_one_or_none()
     
     if db_integration is None:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Integration not found")
-        
-    # Update fields
-    update_data = integration_update.dict(exclude_unset=True)
-    
-    # For config, we want to completely replace it rather than update it
-    # This ensures old fields are removed when switching integration types
-    if 'config' in update_data:
-        update_data['config'] = update_data['config']
     
-    for key, value in update_data.items():
-        setattr(db_integration, key, value)
-        
+    # Serialize before commit expires the returned row
+    response = IntegrationResponse.model_validate(db_integration)
     db.commit()
-    db.refresh(db_integration)
     
-    return db_integration
+    # Drop the cached client built from the old settings
+    IntegrationFactory.evict_integration(integration_id)
+    invalidate_integration_cache(integration_id)
+    
+    return response
 
 @router.delete("/{integration_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_integration(integration_id: int, db: Session = Depends(get_db)):
+def delete_integration(integration_id: int, db: Session = Depends(get_db)):
     """Delete an integration"""
-    db_integration = db.query(Integration).filter(Integration.id == integration_id).first()
+    # Single DELETE; the rowcount tells us whether the integration existed
+    result = db.execute(
+        delete(Integration).where(Integration.id == integration_id),
+        execution_options={"synchronize_session": False}
+    )
     
-    if db_integration is None:
+    if result.rowcount == 0:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Integration not found")
-        
-    db.delete(db_integration)
+    
     db.commit()
+    IntegrationFactory.evict_integration(integration_id)
+    invalidate_integration_cache(integration_id)
     
     return None
 
-@router.get("/types", response_model=List[str])
-async def get_integration_types():
-    """Get supported integration types"""
-    return ["github", "jira", "trello"]
-
-@router.get("/types/{integration_type}/metrics", response_model=Dict[str, str])
-async def get_integration_metrics(integration_type: str):
-    """Get supported metrics for an integration type"""
-    try:
-        return IntegrationFactory.get_supported_metrics(integration_type)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
 @router.post("/github/repositories", response_model=RepositoriesResponse)
 async def get_github_repositories(request: GitHubRepositoriesRequest):
     """Get GitHub repositories for a user"""
     try:
         client = GitHubIntegration(api_token=request.api_key)
-        repositories = client.get_repositories()
+        # PyGithub is blocking, so page through the repositories in a worker thread
+        repositories = await asyncio.to_thread(client.get_repositories)
         return {"repositories": repositories}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -242,14 +474,55 @@ async def get_trello_boards(request: TrelloBoardsRequest):
     try:
         # Create TrelloIntegration instance with both API key and token
         client = TrelloIntegration(api_key=request.api_key, token=request.token)
-        boards_df = client.get_boards()
+        boards_df = await asyncio.to_thread(client.get_boards)
         # Convert DataFrame to list of dictionaries
         boards = boards_df.to_dict('records') if not boards_df.empty else []
         return {"boards": boards}
     except Exception as e:
-        print(f"Error fetching Trello boards: {str(e)}")  # Add logging
+        logger.error("Error fetching Trello boards: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
+def save_metrics_in_own_session(bind, integration: Integration, metrics: Dict[str, Any]) -> None:
+    """Store metrics inline in a short-lived session of their own.
+    
+    The request session is shared by every fetch in a metrics fan-out;
+    committing it would expire the sibling fetches' loaded rows and make
+    each of them reload, so it is only ever read from during the fan-out.
+    """
+    with Session(bind=bind) as store_db:
+        save_metrics(store_db, integration, metrics)
+
+async def gather_integration_metrics(
+    integrations: List[Integration],
+    metrics_requests: List[MetricsRequest],
+    db: Session
+) -> List[Any]:
+    """Fetch metrics for each (integration, request) pair concurrently.
+    
+    At most METRICS_FETCH_CONCURRENCY provider calls run at once so a large
+    project or team can't flood the worker threadpool. Failures are returned
+    in place, as with asyncio.gather(return_exceptions=True).
+    """
+    semaphore = asyncio.Semaphore(METRICS_FETCH_CONCURRENCY)
+    
+    async def fetch_bounded(integration: Integration, metrics_request: MetricsRequest):
+        async with semaphore:
+            return await fetch_integration_metrics(integration, metrics_request, db, cache_result=False)
+    
+    results = await asyncio.gather(
+        *(fetch_bounded(integration, metrics_request) for integration, metrics_request in zip(integrations, metrics_requests)),
+        return_exceptions=True
+    )
+    
+    # Cache the successful results together, in one pipelined round trip
+    # rather than a SETEX per integration, off the event loop
+    await asyncio.to_thread(set_cached_json_many, {
+        metrics_cache_key(integration.id, metrics_request): result
+        for integration, metrics_request, result in zip(integrations, metrics_requests, results)
+        if is_cacheable_metrics_response(result)
+    }, METRICS_CACHE_TTL_SECONDS)
+    return results
+
 @router.post("/{integration_id}/metrics", response_model=MetricsResponse)
 async def get_metrics(
     integration_id: int, 
@@ -257,63 +530,53 @@ async def get_metrics(
     db: Session = Depends(get_db)
 ):
     """Get metrics from an integration"""
+    # Redis and the DB are sync clients, so read them off the event loop
+    cached_response = await asyncio.to_thread(get_cached_json, metrics_cache_key(integration_id, metrics_request))
+    if cached_response is not None:
+        return cached_response
+    
     # Get integration from DB
-    integration = db.query(Integration).filter(Integration.id == integration_id).first()
+    integration = await asyncio.to_thread(db.get, Integration, integration_id)
     
     if integration is None:
         raise HTTPException(status_code=404, detail="Integration not found")
     
-    # Check if integration has required configuration    
-    if integration.type == "github" and (not integration.config or not integration.config.get("repository")):
-        # GitHub integration requires a repository name
-        return {
-            "integration_id": integration.id,
-            "integration_name": integration.name,
-            "integration_type": integration.type,
-            "metrics": {
-                "error": "Repository name not configured. Please edit the integration to add a repository."
-            }
-        }
+    return await fetch_integration_metrics(integration, metrics_request, db)
+
+async def fetch_integration_metrics(
+    integration: Integration,
+    metrics_request: MetricsRequest,
+    db: Session,
+    cache_result: bool = True
+) -> Dict[str, Any]:
+    """Fetch metrics for an already-loaded integration, caching successful results.
     
-    if integration.type == "jira" and not metrics_request.project_key:
-        # Jira integration requires a project key
-        return {
-            "integration_id": integration.id,
-            "integration_name": integration.name,
-            "integration_type": integration.type,
-            "metrics": {
-                "error": "Project key not provided. Please specify a project_key in your request."
-            }
-        }
+    The project/team metrics endpoints call this with the rows they loaded
+    so the fan-out doesn't look each integration up again. They pass
+    cache_result=False and cache the whole batch at once.
+    """
+    cache_key = metrics_cache_key(integration.id, metrics_request)
     
-    if integration.type == "trello" and not metrics_request.board_id:
-        # Trello integration requires a board ID
-        return {
-            "integration_id": integration.id,
-            "integration_name": integration.name,
-            "integration_type": integration.type,
-            "metrics": {
-                "error": "Board ID not provided. Please specify a board_id in your request."
-            }
-        }
+    # Check if integration has required configuration
+    required = REQUIRED_METRICS_PARAMS.get(integration.type)
+    if required is not None:
+        has_param, missing_message = required
+        if not has_param(integration, metrics_request):
+            return metrics_response(integration, {"error": missing_message})
         
     # Create integration instance
     try:
-        config = {
-            "api_token": integration.api_key,
-            "server": integration.api_url,
-            "username": integration.username,
-            "repository": integration.config.get("repository") if integration.config else None,
-            "api_key": integration.api_key if integration.type == "trello" else (integration.config.get("api_key") if integration.config else None),
-            "api_secret": integration.config.get("api_secret") if integration.config else None,
-            "token": integration.config.get("token") if integration.config else None
-        }
+        config = get_client_config(integration)
         
-        print(f"Integration {integration.id} config: {config}")
+        logger.debug("Integration %s config redacted", integration.id)
         
-        integration_instance = IntegrationFactory.create_integration(
+        # Client construction and metric calculation make blocking HTTP calls to
+        # the provider, so run them in worker threads to keep the event loop free
+        integration_instance = await asyncio.to_thread(
+            IntegrationFactory.get_or_create_integration,
             integration_type=integration.type,
-            config=config
+            config=config,
+            integration_id=integration.id
         )
         
         # Prepare config for metric calculation
@@ -325,68 +588,40 @@ async def get_metrics(
         
         # Get metrics
         try:
-            metrics = IntegrationFactory.get_metrics(integration_instance, metrics_config)
+            metrics = await asyncio.to_thread(IntegrationFactory.get_metrics, integration_instance, metrics_config)
             
-            # Store metrics in database
-            # Store each metric
-            for metric_name, metric_value in metrics.items():
-                if isinstance(metric_value, (int, float)):
-                    # Create a new metric record
-                    metric = Metric(
-                        name=metric_name,
-                        category=integration.type,  # Use integration type as category
-                        value=float(metric_value),
-                        raw_data=metrics,  # Store all metrics as raw data
-                        team_id=integration.team_id,
-                        project_id=integration.project_id
-                    )
-                    db.add(metric)
+            # Build the response before any commit expires the loaded row
+            response = metrics_response(integration, metrics)
             
-            # Update last sync in DB
-            integration.last_sync = func.now()
-            db.commit()
+            # Persist the metrics and last_sync in a Celery worker so the
+            # request doesn't wait on the writes
+            try:
+                store_metrics_task.delay(integration.id, metrics)
+            except Exception as e:
+                logger.error("Error queueing metrics storage for integration %s, storing inline: %s", integration.id, e)
+                await asyncio.to_thread(save_metrics_in_own_session, db.get_bind(), integration, metrics)
             
         except ValueError as ve:
             # Handle validation errors in a user-friendly way
-            return {
-                "integration_id": integration.id,
-                "integration_name": integration.name,
-                "integration_type": integration.type,
-                "metrics": {
-                    "error": str(ve)
-                }
-            }
+            return metrics_response(integration, {"error": str(ve)})
         except Exception as e:
             # Log detailed error but return user-friendly message
-            print(f"Error getting metrics for integration {integration.id}: {str(e)}")
+            logger.error("Error getting metrics for integration %s: %s", integration.id, e)
             
             # Check for GitHub empty repository error
             error_str = str(e)
             if "409" in error_str and "Git Repository is empty" in error_str:
-                return {
-                    "integration_id": integration.id,
-                    "integration_name": integration.name,
-                    "integration_type": integration.type,
-                    "metrics": {
-                        "error": "The GitHub repository is empty. Please make at least one commit before syncing."
-                    }
-                }
+                return metrics_response(integration, {
+                    "error": "The GitHub repository is empty. Please make at least one commit before syncing."
+                })
             
-            return {
-                "integration_id": integration.id,
-                "integration_name": integration.name,
-                "integration_type": integration.type,
-                "metrics": {
-                    "error": "Failed to retrieve metrics. Please check your integration configuration."
-                }
-            }
+            return metrics_response(integration, {
+                "error": "Failed to retrieve metrics. Please check your integration configuration."
+            })
         
-        return {
-            "integration_id": integration.id,
-            "integration_name": integration.name,
-            "integration_type": integration.type,
-            "metrics": metrics
-        }
+        if cache_result and is_cacheable_metrics_response(response):
+            await asyncio.to_thread(set_cached_json, cache_key, response, METRICS_CACHE_TTL_SECONDS)
+        return response
     except Exception as e:
-        print(f"Exception in metrics endpoint: {str(e)}")
+        logger.error("Exception in metrics endpoint: %s", e)
         raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
@@ -1,18 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query # Added Query
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import insert, select, update
 from sqlalchemy.sql import func # Added func
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 import asyncio 
+import logging
 
-from src.backend.database import get_db
+from src.backend.database import get_db, release_connection
+from src.backend.coalesce import coalesced
+from src.backend.pagination import encode_cursor, decode_cursor, count_cache_key, get_table_count
 from src.models.project import Project
+from src.integrations.cache import get_cached_json, get_cached_json_many, set_cached_json, delete_cached
 from src.models.integration import Integration # Import Integration model
 # Import relevant Pydantic models and functions from integrations router
-from src.backend.routes.integrations import IntegrationResponse, MetricsRequest, get_metrics 
+from src.backend.routes.integrations import IntegrationResponse, build_metrics_request, gather_integration_metrics, metrics_cache_key
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
+# Single-project reads are cached briefly and dropped on update/delete
+PROJECT_CACHE_TTL_SECONDS = 60
+
 # Pydantic models for request/response
 class ProjectBase(BaseModel):
     name: str
@@ -25,8 +36,7 @@ class ProjectResponse(ProjectBase):
     id: int
     active: bool
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Define a new response model for aggregated project metrics
 class ProjectMetricsResponse(BaseModel):
@@ -40,106 +50,174 @@ class ProjectMetricsResponse(BaseModel):
 
 # New Pydantic model for paginated Project response
 class PaginatedProjectsResponse(BaseModel):
-    total_count: int
     items: List[ProjectResponse]
+    next_cursor: Optional[str] = None
+    total_count: Optional[int] = None
+
+
+# Columns returned for each project in list responses (the ProjectResponse fields)
+PROJECT_RESPONSE_COLUMNS = (Project.id, Project.name, Project.description, Project.active)
 
+def project_cache_key(project_id: int) -> str:
+    return f"projects:{project_id}"
 
 # Routes
 @router.get("/", response_model=PaginatedProjectsResponse)
-async def get_projects(
+def get_projects(
     db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0, description="Number of items to skip"),
-    limit: int = Query(100, ge=1, le=200, description="Number of items to return per page (max 200)")
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    skip: int = Query(0, ge=0, description="Number of items to skip (ignored when a cursor is given)"),
+    limit: int = Query(100, ge=1, le=200, description="Number of items to return per page (max 200)"),
+    include_total: bool = Query(False, description="Also return the total number of projects")
 ):
-    """Get all projects with pagination"""
-    total_count = db.query(func.count(Project.id)).scalar()
-    projects = db.query(Project).offset(skip).limit(limit).all()
-    return PaginatedProjectsResponse(total_count=total_count, items=projects)
+    """Get all projects with keyset pagination"""
+    # Select just the response columns; plain rows are much cheaper than hydrated ORM objects
+    stmt = select(*PROJECT_RESPONSE_COLUMNS).order_by(Project.id)
+    if cursor is not None:
+        # Seek past the last seen ID on the primary key index instead of OFFSET
+        stmt = stmt.where(Project.id > decode_cursor(cursor))
+    elif skip:
+        stmt = stmt.offset(skip)
+    # Fetch one extra row to know whether there is a next page
+    rows = db.execute(stmt.limit(limit + 1)).mappings().all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["id"])
+    
+    total_count = get_table_count(db, Project) if include_total else None
+    # The columns already match ProjectResponse, so skip per-item pydantic validation
+    return ORJSONResponse({
+        "items": [dict(row) for row in rows],
+        "next_cursor": next_cursor,
+        "total_count": total_count
+    })
 
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
-async def create_project(project: ProjectCreate, db: Session = Depends(get_db)):
+def create_project(project: ProjectCreate, db: Session = Depends(get_db)):
     """Create a new project"""
-    db_project = Project(
-        name=project.name,
-        description=project.description
-    )
+    # INSERT ... RETURNING hands back the stored row, so no refresh SELECT is needed
+    db_project = db.execute(
+        insert(Project)
+        .values(name=project.name, description=project.description)
+        .returning(Project)
+    ).scalar_one()
     
-    db.add(db_project)
+    # Serialize before commit expires the returned row
+    response = ProjectResponse.model_validate(db_project)
     db.commit()
-    db.refresh(db_project)
+    delete_cached(count_cache_key(Project))
     
-    return db_project
+    return response
 
 @router.get("/{project_id}", response_model=ProjectResponse)
-async def get_project(project_id: int, db: Session = Depends(get_db)):
+def get_project(project_id: int, db: Session = Depends(get_db)):
     """Get project by ID"""
+    cache_key = project_cache_key(project_id)
+    cached_project = get_cached_json(cache_key)
+    if cached_project is not None:
+        return cached_project
+    
     project = db.query(Project).filter(Project.id == project_id).first()
     
     if project is None:
         raise HTTPException(status_code=404, detail="Project not found")
-        
-    return project
+    
+    response = ProjectResponse.model_validate(project).model_dump()
+    set_cached_json(cache_key, response, PROJECT_CACHE_TTL_SECONDS)
+    return response
 
 @router.put("/{project_id}", response_model=ProjectResponse)
-async def update_project(
+def update_project(
     project_id: int, 
     project_update: ProjectCreate, 
     db: Session = Depends(get_db)
 ):
     """Update a project"""
-    db_project = db.query(Project).filter(Project.id == project_id).first()
+    update_data = project_update.model_dump(exclude_unset=True)
+    
+    # Single UPDATE ... RETURNING instead of SELECT + per-field setattr + UPDATE
+    db_project = db.execute(
+        update(Project)
+        .where(Project.id == project_id)
+        .values(**update_data)
+        .returning(Project)
+    ).scalar_one_or_none()
     
     if db_project is None:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Project not found")
-        
-    # Update fields
-    for key, value in project_update.dict(exclude_unset=True).items():
-        setattr(db_project, key, value)
-        
+    
+    # Serialize before commit expires the returned row
+    response = ProjectResponse.model_validate(db_project)
     db.commit()
-    db.refresh(db_project)
+    delete_cached(project_cache_key(project_id))
     
-    return db_project
+    return response
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_project(project_id: int, db: Session = Depends(get_db)):
+def delete_project(project_id: int, db: Session = Depends(get_db)):
     """Delete a project"""
-    db_project = db.query(Project).filter(Project.id == project_id).first()
+    # Set project as inactive instead of deleting, in one UPDATE; the rowcount
+    # tells us whether the project existed
+    result = db.execute(
+        update(Project).where(Project.id == project_id).values(active=False),
+        execution_options={"synchronize_session": False}
+    )
     
-    if db_project is None:
+    if result.rowcount == 0:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Project not found")
-        
-    # Set project as inactive instead of deleting
-    db_project.active = False
+    
     db.commit()
+    delete_cached(project_cache_key(project_id))
     
     return None
 
 @router.get("/{project_id}/integrations")
-async def get_project_integrations(project_id: int, db: Session = Depends(get_db)):
+def get_project_integrations(project_id: int, db: Session = Depends(get_db)):
     """Get all integrations for a project"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    # Load the project and its integrations in a single joined SELECT
+    # instead of a lazy load when the collection is touched
+    project = (
+        db.query(Project)
+        .options(joinedload(Project.integrations))
+        .filter(Project.id == project_id)
+        .first()
+    )
     
     if project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Query real integrations
-    project_integrations = db.query(Integration).filter(Integration.project_id == project_id).all()
-    return project_integrations
+    return project.integrations
+
+def load_project_with_active_integrations(db: Session, project_id: int) -> Optional[Project]:
+    """Load a project and only its active integrations in one round trip"""
+    return (
+        db.query(Project)
+        .options(joinedload(Project.integrations.and_(Integration.active == True)))
+        .filter(Project.id == project_id)
+        .first()
+    )
 
 @router.get("/{project_id}/metrics", response_model=ProjectMetricsResponse)
 async def get_project_metrics(project_id: int, db: Session = Depends(get_db)):
     """Get all metrics for a project"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    # Concurrent dashboard loads for the same project share one fan-out
+    return await coalesced(("project_metrics", project_id), lambda: compute_project_metrics(project_id, db))
+
+async def compute_project_metrics(project_id: int, db: Session) -> ProjectMetricsResponse:
+    """Load a project's active integrations and gather their metrics"""
+    # The sync Session would block the event loop, so load the project off the loop
+    project = await asyncio.to_thread(load_project_with_active_integrations, db, project_id)
     
     if project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Get active integrations for this project
-    integrations = db.query(Integration).filter(
-        Integration.project_id == project_id,
-        Integration.active == True
-    ).all()
+    integrations = project.integrations
+    # Everything needed is loaded; don't pin a pooled connection through the provider calls
+    release_connection(db)
     
     if not integrations:
         return ProjectMetricsResponse(
@@ -152,42 +230,34 @@ async def get_project_metrics(project_id: int, db: Session = Depends(get_db)):
         )
         
     metrics_collection: Dict[int, Dict[str, Any]] = {}
-    tasks = []
-
-    for integration in integrations:
-        project_key = None
-        board_id = None
-        days = 30  # Default lookback period
-
-        if integration.type.lower() == "jira":
-            project_key = integration.config.get("project_key") if integration.config else None
-            if not project_key:
-                print(f"Warning: project_key not found in config for Jira integration ID {integration.id} of project {project_id}. Metrics might be incomplete or fail.")
-        elif integration.type.lower() == "trello":
-            board_id = integration.config.get("board_id") if integration.config else None
-            if not board_id:
-                 print(f"Warning: board_id not found in config for Trello integration ID {integration.id} of project {project_id}. Metrics might be incomplete or fail.")
-        
-        current_metrics_request = MetricsRequest(days=days, project_key=project_key, board_id=board_id)
-        
-        tasks.append(
-            get_metrics(
-                integration_id=integration.id,
-                metrics_request=current_metrics_request,
-                db=db
-            )
-        )
 
-    print(f"Gathering metrics for {len(tasks)} integrations concurrently for project {project_id}")
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    print(f"Finished gathering metrics for project {project_id}. Received {len(results)} results.")
+    # Type-specific parameters (project_key/board_id) come from each integration's config
+    metrics_requests = [build_metrics_request(integration) for integration in integrations]
+
+    # One MGET for every integration's cached response; only the misses are fetched.
+    # Redis is a sync client, so the round trip runs off the event loop
+    results = await asyncio.to_thread(get_cached_json_many, [
+        metrics_cache_key(integration.id, metrics_request)
+        for integration, metrics_request in zip(integrations, metrics_requests)
+    ])
+    misses = [i for i, result in enumerate(results) if result is None]
+
+    logger.debug("Gathering metrics for %s of %s integrations concurrently for project %s", len(misses), len(integrations), project_id)
+    fetched = await gather_integration_metrics(
+        [integrations[i] for i in misses],
+        [metrics_requests[i] for i in misses],
+        db
+    )
+    for i, result in zip(misses, fetched):
+        results[i] = result
+    logger.debug("Finished gathering metrics for project %s. Received %s results.", project_id, len(results))
 
     for i, result in enumerate(results):
         integration = integrations[i]
         integration_id_key = integration.id # Use actual integration ID as key
 
         if isinstance(result, Exception):
-            print(f"Error fetching metrics for integration {integration.id} ({integration.name}) for project {project_id}: {str(result)}")
+            logger.error("Error fetching metrics for integration %s (%s) for project %s: %s", integration.id, integration.name, project_id, result)
             metrics_collection[integration_id_key] = {
                 "source": integration.name,
                 "type": integration.type,
@@ -197,7 +267,7 @@ async def get_project_metrics(project_id: int, db: Session = Depends(get_db)):
         elif result and "metrics" in result:
             metrics_data = result["metrics"]
             if isinstance(metrics_data, dict) and "error" in metrics_data:
-                 print(f"Application error fetching metrics for integration {integration.id} ({integration.name}) for project {project_id}: {metrics_data['error']}")
+                 logger.warning("Application error fetching metrics for integration %s (%s) for project %s: %s", integration.id, integration.name, project_id, metrics_data["error"])
                  metrics_collection[integration_id_key] = {
                     "source": integration.name,
                     "type": integration.type,
@@ -211,7 +281,7 @@ async def get_project_metrics(project_id: int, db: Session = Depends(get_db)):
                     "data": metrics_data
                 }
         else:
-            print(f"Unexpected result structure for integration {integration.id} for project {project_id}: {result}")
+            logger.error("Unexpected result structure for integration %s for project %s: %s", integration.id, project_id, result)
             metrics_collection[integration_id_key] = {
                 "source": integration.name,
                 "type": integration.type,
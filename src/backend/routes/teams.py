@@ -1,21 +1,57 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query # Added Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import insert, select, update
 from sqlalchemy.sql import func # Added func
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel
-from datetime import datetime, timedelta
-import random
-import asyncio # Import asyncio
+from pydantic import BaseModel, ConfigDict
+import asyncio
+import logging
 
-from src.backend.database import get_db
+from src.backend.database import get_db, release_connection
+from src.backend.coalesce import coalesced
+from src.backend.pagination import encode_cursor, decode_cursor, count_cache_key, get_table_count
+from src.integrations.cache import (
+    get_cached_json,
+    get_cached_json_many,
+    set_cached_json,
+    get_cached_bytes,
+    set_cached_bytes,
+    dump_json,
+    delete_cached,
+    invalidate_cache_prefix,
+)
 from src.models.team import Team
 from src.models.project import Project
 from src.models.integration import Integration
-from src.backend.routes.integrations import get_metrics, MetricsRequest # Import MetricsRequest
+from src.backend.routes.integrations import (
+    METRICS_CACHE_TTL_SECONDS,
+    TEAM_METRICS_CACHE_PREFIX,
+    build_metrics_request,
+    gather_integration_metrics,
+    metrics_cache_key,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/teams", tags=["teams"])
 
+# Single-team reads are cached briefly and dropped on update/delete
+TEAM_CACHE_TTL_SECONDS = 60
+
+def team_cache_key(team_id: int) -> str:
+    return f"teams:{team_id}"
+
+# Aggregated team metrics live as long as the per-integration results they're built from
+TEAM_METRICS_CACHE_TTL_SECONDS = METRICS_CACHE_TTL_SECONDS
+
+def team_metrics_cache_prefix(team_id: int) -> str:
+    return f"{TEAM_METRICS_CACHE_PREFIX}{team_id}:"
+
+def team_metrics_cache_key(team_id: int, integrations: List[Integration]) -> str:
+    integration_ids = ",".join(map(str, sorted(integration.id for integration in integrations)))
+    return f"{team_metrics_cache_prefix(team_id)}integrations={integration_ids}"
+
 # Pydantic models for request/response
 class TeamBase(BaseModel):
     name: str
@@ -29,13 +65,16 @@ class TeamResponse(TeamBase):
     active: bool
     maturity_level: int
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # New Pydantic model for paginated Team response
 class PaginatedTeamsResponse(BaseModel):
-    total_count: int
     items: List[TeamResponse]
+    next_cursor: Optional[str] = None
+    total_count: Optional[int] = None
+
+# Columns returned for each team in list responses (the TeamResponse fields)
+TEAM_RESPONSE_COLUMNS = (Team.id, Team.name, Team.description, Team.active, Team.maturity_level)
 
 class ProjectBrief(BaseModel):
     id: int
@@ -43,264 +82,237 @@ class ProjectBrief(BaseModel):
     description: Optional[str] = None
     active: bool
     
-    class Config:
-        orm_mode = True
-
-# Mock data for integrations (similar to projects.py)
-MOCK_INTEGRATION_TYPES = ["GitHub", "Jira", "Trello", "GitLab"]
-
-def generate_mock_integrations(team_id: int) -> List[Dict[str, Any]]:
-    """Generate mock integrations for a team"""
-    num_integrations = random.randint(1, 3)
-    integration_types = random.sample(MOCK_INTEGRATION_TYPES, num_integrations)
-    
-    return [
-        {
-            "id": i + 1,
-            "team_id": team_id,
-            "type": integration_type,
-            "config": {"url": f"https://api.{integration_type.lower()}.com", "token": "sample_token"},
-            "active": True,
-            "created_at": (datetime.now() - timedelta(days=random.randint(1, 30))).isoformat()
-        }
-        for i, integration_type in enumerate(integration_types)
-    ]
-
-def generate_mock_metrics(team_id: int) -> Dict[str, Any]:
-    """Generate mock metrics data for a team"""
-    num_sprints = 5
-    sprint_names = [f"Sprint {i+1}" for i in range(num_sprints)]
-    
-    # Generate increasing velocity with some variation
-    base_velocity = random.randint(8, 15)
-    velocities = []
-    for i in range(num_sprints):
-        v = base_velocity + i + random.randint(-2, 4)
-        velocities.append(v)
-    
-    # Generate decreasing burndown
-    total_work = random.randint(80, 150)
-    burndown = [total_work]
-    remaining = total_work
-    for i in range(1, num_sprints):
-        work_done = random.randint(15, 25)
-        remaining = max(0, remaining - work_done)
-        burndown.append(remaining)
-    
-    # Generate improving cycle time
-    base_cycle_time = random.uniform(4.0, 7.0)
-    cycle_times = []
-    for i in range(num_sprints):
-        ct = max(1.0, base_cycle_time - (i * 0.5) + random.uniform(-0.3, 0.3))
-        cycle_times.append(round(ct, 1))
-    
-    # Team-specific metrics
-    maturity_metrics = {
-        "collaboration_score": round(random.uniform(1.0, 5.0), 1),
-        "technical_practices_score": round(random.uniform(1.0, 5.0), 1),
-        "delivery_predictability": round(random.uniform(1.0, 5.0), 1),
-        "quality_score": round(random.uniform(1.0, 5.0), 1),
-        "overall_maturity": round(random.uniform(1.0, 5.0), 1)
-    }
-    
-    return {
-        "velocity": velocities,
-        "burndown": burndown,
-        "cycletime": cycle_times,
-        "sprints": sprint_names,
-        "team_id": team_id,
-        "maturity_metrics": maturity_metrics
-    }
+    model_config = ConfigDict(from_attributes=True)
 
 # Routes
 @router.get("/", response_model=PaginatedTeamsResponse)
-async def get_teams(
+def get_teams(
     db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0, description="Number of items to skip"),
-    limit: int = Query(100, ge=1, le=200, description="Number of items to return per page (max 200)")
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    skip: int = Query(0, ge=0, description="Number of items to skip (ignored when a cursor is given)"),
+    limit: int = Query(100, ge=1, le=200, description="Number of items to return per page (max 200)"),
+    include_total: bool = Query(False, description="Also return the total number of teams")
 ):
-    """Get all teams with pagination"""
-    total_count = db.query(func.count(Team.id)).scalar()
-    teams = db.query(Team).offset(skip).limit(limit).all()
+    """Get all teams with keyset pagination"""
+    # Select just the response columns as plain rows rather than hydrating Team objects
+    stmt = select(*TEAM_RESPONSE_COLUMNS).order_by(Team.id)
+    if cursor is not None:
+        # Seek past the last seen ID on the primary key index instead of OFFSET
+        stmt = stmt.where(Team.id > decode_cursor(cursor))
+    elif skip:
+        stmt = stmt.offset(skip)
+    # Fetch one extra row to know whether there is a next page
+    rows = db.execute(stmt.limit(limit + 1)).mappings().all()
     
-    # Convert SQLAlchemy models to dictionaries
-    team_dicts = []
-    for team in teams:
-        team_dict = {
-            "id": team.id,
-            "name": team.name,
-            "description": team.description,
-            "active": team.active,
-            "maturity_level": team.maturity_level
-        }
-        team_dicts.append(team_dict)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["id"])
     
-    return PaginatedTeamsResponse(total_count=total_count, items=team_dicts)
+    # Only pay for the total when the caller asks for it; it is cached and estimated on large tables
+    total_count = get_table_count(db, Team) if include_total else None
+    # The columns already match TeamResponse, so skip per-item pydantic validation
+    return ORJSONResponse({
+        "items": [dict(row) for row in rows],
+        "next_cursor": next_cursor,
+        "total_count": total_count
+    })
 
 @router.post("/", response_model=TeamResponse, status_code=status.HTTP_201_CREATED)
-async def create_team(team: TeamCreate, db: Session = Depends(get_db)):
+def create_team(team: TeamCreate, db: Session = Depends(get_db)):
     """Create a new team"""
-    db_team = Team(
-        name=team.name,
-        description=team.description
-    )
+    # INSERT ... RETURNING hands back the stored row, so no refresh SELECT is needed
+    db_team = db.execute(
+        insert(Team)
+        .values(name=team.name, description=team.description)
+        .returning(Team)
+    ).scalar_one()
     
-    db.add(db_team)
+    # Serialize before commit expires the returned row
+    response = TeamResponse.model_validate(db_team)
     db.commit()
-    db.refresh(db_team)
+    delete_cached(count_cache_key(Team))
     
-    return db_team
+    return response
 
 @router.get("/{team_id}", response_model=TeamResponse)
-async def get_team(team_id: int, db: Session = Depends(get_db)):
+def get_team(team_id: int, db: Session = Depends(get_db)):
     """Get team by ID"""
+    cache_key = team_cache_key(team_id)
+    cached_team = get_cached_json(cache_key)
+    if cached_team is not None:
+        return cached_team
+    
     team = db.query(Team).filter(Team.id == team_id).first()
     
     if team is None:
         raise HTTPException(status_code=404, detail="Team not found")
-        
-    return team
+    
+    response = TeamResponse.model_validate(team).model_dump()
+    set_cached_json(cache_key, response, TEAM_CACHE_TTL_SECONDS)
+    return response
 
 @router.put("/{team_id}", response_model=TeamResponse)
-async def update_team(
+def update_team(
     team_id: int, 
     team_update: TeamCreate, 
     db: Session = Depends(get_db)
 ):
     """Update a team"""
-    db_team = db.query(Team).filter(Team.id == team_id).first()
+    update_data = team_update.model_dump(exclude_unset=True)
+    
+    # Single UPDATE ... RETURNING instead of SELECT + per-field setattr + UPDATE + refresh
+    db_team = db.execute(
+        update(Team)
+        .where(Team.id == team_id)
+        .values(**update_data)
+        .returning(Team)
+    ).scalar_one_or_none()
     
     if db_team is None:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Team not found")
-        
-    # Update fields
-    for key, value in team_update.dict(exclude_unset=True).items():
-        setattr(db_team, key, value)
-        
+    
+    # Serialize before commit expires the returned row
+    response = TeamResponse.model_validate(db_team)
     db.commit()
-    db.refresh(db_team)
+    delete_cached(team_cache_key(team_id))
+    # The aggregate carries the team's name and maturity level
+    invalidate_cache_prefix(team_metrics_cache_prefix(team_id))
     
-    return db_team
+    return response
 
 @router.delete("/{team_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_team(team_id: int, db: Session = Depends(get_db)):
+def delete_team(team_id: int, db: Session = Depends(get_db)):
     """Delete a team"""
-    db_team = db.query(Team).filter(Team.id == team_id).first()
+    # Set team as inactive instead of deleting, in one UPDATE; the rowcount
+    # tells us whether the team existed
+    result = db.execute(
+        update(Team).where(Team.id == team_id).values(active=False),
+        execution_options={"synchronize_session": False}
+    )
     
-    if db_team is None:
+    if result.rowcount == 0:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Team not found")
-        
-    # Set team as inactive instead of deleting
-    db_team.active = False
+    
     db.commit()
+    delete_cached(team_cache_key(team_id))
+    invalidate_cache_prefix(team_metrics_cache_prefix(team_id))
     
     return None
 
 @router.get("/{team_id}/projects", response_model=List[ProjectBrief])
-async def get_team_projects(team_id: int, db: Session = Depends(get_db)):
+def get_team_projects(team_id: int, db: Session = Depends(get_db)):
     """Get all projects for a team"""
-    team = db.query(Team).filter(Team.id == team_id).first()
+    # Outer join from the team so one round trip both checks it exists and
+    # lists its projects; a team without projects comes back as one all-NULL row
+    rows = db.execute(
+        select(Team.id.label("team_id"), Project.id, Project.name, Project.description, Project.active)
+        .outerjoin(Project, Project.team_id == Team.id)
+        .where(Team.id == team_id)
+        .order_by(Project.id)
+    ).all()
     
-    if team is None:
+    if not rows:
         raise HTTPException(status_code=404, detail="Team not found")
-        
-    return team.projects
+    
+    return ORJSONResponse([
+        {"id": project_id, "name": name, "description": description, "active": active}
+        for _, project_id, name, description, active in rows
+        if project_id is not None
+    ])
 
 @router.get("/{team_id}/integrations")
-async def get_team_integrations(team_id: int, db: Session = Depends(get_db)):
+def get_team_integrations(team_id: int, db: Session = Depends(get_db)):
     """Get all integrations for a team"""
-    team = db.query(Team).filter(Team.id == team_id).first()
+    # Load the team and its integrations in a single joined SELECT (legacy rows
+    # that only had project_id are backfilled with team_id by update-db.py)
+    team = (
+        db.query(Team)
+        .options(joinedload(Team.integrations))
+        .filter(Team.id == team_id)
+        .first()
+    )
     
     if team is None:
         raise HTTPException(status_code=404, detail="Team not found")
     
-    # Query for real integrations linked to this team
-    # Check both team_id and project_id fields for backward compatibility
-    integrations = db.query(Integration).filter(
-        or_(
-            Integration.team_id == team_id,
-            Integration.project_id == team_id
-        )
-    ).all()
-    
-    # Verify each integration still exists by checking if we can get it by ID
-    # This ensures we don't return any "phantom" integrations
-    valid_integrations = []
-    for integration in integrations:
-        check_integration = db.query(Integration).filter(Integration.id == integration.id).first()
-        if check_integration:
-            valid_integrations.append(integration)
-    
-    return valid_integrations
+    return team.integrations
+
+def load_team_with_active_integrations(db: Session, team_id: int) -> Optional[Team]:
+    """Load a team and only its active integrations in one round trip"""
+    return (
+        db.query(Team)
+        .options(joinedload(Team.integrations.and_(Integration.active == True)))
+        .filter(Team.id == team_id)
+        .first()
+    )
 
 @router.get("/{team_id}/metrics")
 async def get_team_metrics(team_id: int, db: Session = Depends(get_db)):
     """Get all metrics for a team"""
-    team = db.query(Team).filter(Team.id == team_id).first()
+    # Concurrent dashboard loads for the same team share one fan-out
+    body = await coalesced(("team_metrics", team_id), lambda: compute_team_metrics(team_id, db))
+    return Response(content=body, media_type="application/json")
+
+async def compute_team_metrics(team_id: int, db: Session) -> bytes:
+    """Load a team's active integrations and aggregate their metrics, serialized as JSON"""
+    # The sync Session would block the event loop, so load the team off the loop
+    team = await asyncio.to_thread(load_team_with_active_integrations, db, team_id)
     
     if team is None:
         raise HTTPException(status_code=404, detail="Team not found")
     
-    # Get real integrations for this team
-    integrations = db.query(Integration).filter(
-        or_(
-            Integration.team_id == team_id,
-            Integration.project_id == team_id
-        )
-    ).all()
+    integrations = team.integrations
+    # Everything needed is loaded; don't pin a pooled connection through the provider calls
+    release_connection(db)
     
     # If no integrations, return minimal data structure
     if not integrations:
-        return {
+        return dump_json({
             "message": "No integrations found for this team",
             "team_id": team_id,
             "integrations_count": 0
-        }
+        })
+    
+    # The aggregate is keyed on the integration set, so adding or removing one misses naturally
+    cache_key = team_metrics_cache_key(team_id, integrations)
+    # Cached bytes go straight to the client, without a decode and re-encode
+    cached_body = await asyncio.to_thread(get_cached_bytes, cache_key)
+    if cached_body is not None:
+        return cached_body
     
     # Collect metrics from all integrations concurrently
     metrics_collection = {}
-    tasks = []
 
-    for integration in integrations:
-        # Prepare MetricsRequest based on integration type and config
-        project_key = None
-        board_id = None
-        # Default days for team view, can be adjusted if needed
-        days = 30 
+    # Type-specific parameters (project_key/board_id) come from each integration's config
+    metrics_requests = [build_metrics_request(integration) for integration in integrations]
 
-        if integration.type.lower() == "jira":
-            project_key = integration.config.get("project_key") if integration.config else None
-            # If project_key is essential and not found, we might skip or handle error later
-            if not project_key:
-                print(f"Warning: project_key not found in config for Jira integration ID {integration.id}. Metrics might be incomplete or fail.")
-        elif integration.type.lower() == "trello":
-            board_id = integration.config.get("board_id") if integration.config else None
-            if not board_id:
-                 print(f"Warning: board_id not found in config for Trello integration ID {integration.id}. Metrics might be incomplete or fail.")
-        
-        # All integrations (including GitHub) will get 'days'. Jira/Trello add their specific keys.
-        current_metrics_request = MetricsRequest(days=days, project_key=project_key, board_id=board_id)
-        
-        # Append the coroutine to tasks list
-        # The get_metrics function from integrations.py is already async
-        tasks.append(
-            get_metrics(
-                integration_id=integration.id,
-                metrics_request=current_metrics_request,
-                db=db
-            )
-        )
+    # One MGET for every integration's cached response; only the misses are fetched.
+    # Redis is a sync client, so the round trip runs off the event loop
+    results = await asyncio.to_thread(get_cached_json_many, [
+        metrics_cache_key(integration.id, metrics_request)
+        for integration, metrics_request in zip(integrations, metrics_requests)
+    ])
+    misses = [i for i, result in enumerate(results) if result is None]
 
-    # Run all tasks concurrently
-    # return_exceptions=True allows us to handle errors for individual calls
-    print(f"Gathering metrics for {len(tasks)} integrations concurrently for team {team_id}")
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    print(f"Finished gathering metrics for team {team_id}. Received {len(results)} results.")
+    # Run the fetches concurrently (bounded), passing the loaded rows through so they aren't looked up again.
+    # Errors come back in place so we can handle them for individual calls
+    logger.debug("Gathering metrics for %s of %s integrations concurrently for team %s", len(misses), len(integrations), team_id)
+    fetched = await gather_integration_metrics(
+        [integrations[i] for i in misses],
+        [metrics_requests[i] for i in misses],
+        db
+    )
+    for i, result in zip(misses, fetched):
+        results[i] = result
+    logger.debug("Finished gathering metrics for team %s. Received %s results.", team_id, len(results))
 
     for i, result in enumerate(results):
         integration = integrations[i] # Correlate result with its integration
         if isinstance(result, Exception):
-            print(f"Error fetching metrics for integration {integration.id} ({integration.name}): {str(result)}")
+            logger.error("Error fetching metrics for integration %s (%s): %s", integration.id, integration.name, result)
             # Optionally, store error information in metrics_collection
             metrics_collection[integration.id] = {
                 "source": integration.name,
@@ -308,11 +320,11 @@ async def get_team_metrics(team_id: int, db: Session = Depends(get_db)):
                 "error": str(result),
                 "data": {} # Ensure data key exists
             }
-        elif result and "metrics" in result: # result is a dict from MetricsResponse model (or similar structure if get_metrics returns dict directly)
+        elif result and "metrics" in result: # result is a MetricsResponse-shaped dict (cached or freshly fetched)
             metrics_data = result["metrics"]
-            # Check if metrics_data itself has an error key (application-level error from get_metrics)
+            # Check if metrics_data itself has an error key (application-level error from the fetch)
             if isinstance(metrics_data, dict) and "error" in metrics_data:
-                 print(f"Application error fetching metrics for integration {integration.id} ({integration.name}): {metrics_data['error']}")
+                 logger.warning("Application error fetching metrics for integration %s (%s): %s", integration.id, integration.name, metrics_data["error"])
                  metrics_collection[integration.id] = {
                     "source": integration.name,
                     "type": integration.type,
@@ -327,7 +339,7 @@ async def get_team_metrics(team_id: int, db: Session = Depends(get_db)):
                 }
         else:
             # Handle unexpected result structure
-            print(f"Unexpected result structure for integration {integration.id}: {result}")
+            logger.error("Unexpected result structure for integration %s: %s", integration.id, result)
             metrics_collection[integration.id] = {
                 "source": integration.name,
                 "type": integration.type,
@@ -335,9 +347,16 @@ async def get_team_metrics(team_id: int, db: Session = Depends(get_db)):
                 "data": {}
             }
             
+    # Accumulate the summary figures in one pass over the collected metrics
+    velocity = 0
+    merge_rate_sum = 0
+    for m in metrics_collection.values():
+        data = m.get("data")
+        if data:
+            velocity += data.get("pr_count", 0)
+            merge_rate_sum += data.get("pr_merge_rate", 0)
+    
     # Transform the metrics into a standardized dashboard format
-    # velocity_data = [] # Keep if used later, otherwise remove
-    quality_data = []
     team_metrics = {
         "team_id": team_id,
         "team_name": team.name,
@@ -345,10 +364,15 @@ async def get_team_metrics(team_id: int, db: Session = Depends(get_db)):
         "has_metrics": len(metrics_collection) > 0,
         "metrics_by_integration": metrics_collection,
         "summary": {
-            "velocity": sum([m.get("data", {}).get("pr_count", 0) for m in metrics_collection.values() if m.get("data")]) or 0,
-            "quality": sum([m.get("data", {}).get("pr_merge_rate", 0) * 100 for m in metrics_collection.values() if m.get("data")]) / max(1, len(metrics_collection)) if metrics_collection else 0,
+            "velocity": velocity,
+            # Averaged over every integration, including ones that returned errors
+            "quality": merge_rate_sum * 100 / len(metrics_collection) if metrics_collection else 0,
             "maturity_level": team.maturity_level
         }
     }
     
-    return team_metrics 
\ No newline at end of file
+    body = dump_json(team_metrics)
+    # Don't cache integration errors, so the next request retries them
+    if not any(m.get("error") for m in metrics_collection.values()):
+        await asyncio.to_thread(set_cached_bytes, cache_key, body, TEAM_METRICS_CACHE_TTL_SECONDS)
+    return body 
\ No newline at end of file
@@ -1,11 +1,18 @@
-from celery import Celery
+from celery import Celery, group
+from celery.signals import setup_logging
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import logging
 import os
+import queue
+from sqlalchemy import insert, update
 from sqlalchemy.sql import func
 from datetime import datetime
 
 # Import database session and models
 from src.backend.database import SessionLocal
 from src.models.integration import Integration
+from src.models.metric import Metric
 from src.integrations.integration_factory import IntegrationFactory
 
 redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
@@ -19,84 +26,101 @@ app.conf.update(
     enable_utc=True,
 )
 
+logger = logging.getLogger(__name__)
+
+@setup_logging.connect
+def configure_worker_logging(**kwargs):
+    """
+    Log from workers the way the API does: handlers only enqueue records, and a
+    background listener thread does the blocking stream writes, so tasks never
+    contend on the stream lock.
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = QueueListener(log_queue, stream_handler)
+    listener.start()
+    # Flush whatever is still queued when the worker exits
+    atexit.register(listener.stop)
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), handlers=[QueueHandler(log_queue)])
+
 @app.task
 def test_task():
     return "Celery task completed successfully" 
 
-@app.task(bind=True, max_retries=3, default_retry_delay=60) # Added bind=True for self, and retry options
+@app.task(bind=True, max_retries=3, default_retry_delay=60, ignore_result=True) # Added bind=True for self, and retry options
 def initial_sync_metrics_task(self, integration_id: int):
     """
     Asynchronously performs the initial metrics sync for a new integration.
     """
-    print(f"Celery task initial_sync_metrics_task started for integration_id: {integration_id}")
+    logger.info("Celery task initial_sync_metrics_task started for integration_id: %s", integration_id)
     db = SessionLocal()
     try:
         integration = db.query(Integration).filter(Integration.id == integration_id).first()
         if not integration:
-            print(f"Error: Integration with ID {integration_id} not found.")
+            logger.error("Error: Integration with ID %s not found.", integration_id)
             return
 
-        print(f"Processing integration: {integration.name} ({integration.type})")
+        logger.info("Processing integration: %s (%s)", integration.name, integration.type)
 
-        # Prepare config for IntegrationFactory
+        # Read the JSON config once; Trello keeps its own key/token there, the other types use api_key
+        cfg = integration.config or {}
+        credential_overrides = cfg if integration.type == "trello" else {}
         factory_config = {
             "api_token": integration.api_key, # Generic token name
-            "api_key": integration.api_key,   # For Trello compatibility in factory
-            "token": integration.api_key,     # For GitHub/Jira compatibility in factory
+            "api_key": credential_overrides.get("api_key", integration.api_key),   # For Trello compatibility in factory
+            "token": credential_overrides.get("token", integration.api_key),       # For GitHub/Jira compatibility in factory
             "server": integration.api_url,
             "username": integration.username,
-            "repository": integration.config.get("repository") if integration.config else None,
+            "repository": cfg.get("repository"),
             # For Trello, api_secret might be in integration.config if stored separately
-            "api_secret": integration.config.get("api_secret") if integration.config else None,
+            "api_secret": cfg.get("api_secret"),
         }
-        
-        # Ensure specific keys required by factory are present if they differ from integration model fields
-        if integration.type == "trello" and integration.config:
-            if 'api_key' in integration.config: factory_config['api_key'] = integration.config['api_key']
-            if 'token' in integration.config: factory_config['token'] = integration.config['token']
-            # api_secret is already handled above
 
-        print(f"Factory config for {integration.type}: { {k: (v[:4] + '...' if isinstance(v, str) and k.endswith('_key') or k.endswith('_token') else v) for k,v in factory_config.items()} }")
+        # Only the key names are logged, never the credentials
+        logger.debug("Factory config keys for %s: %s", integration.type, sorted(factory_config))
 
-        integration_instance = IntegrationFactory.create_integration(
+        # Reuse the worker's client for this config across runs instead of rebuilding it every sync
+        integration_instance = IntegrationFactory.get_or_create_integration(
             integration_type=integration.type,
-            config=factory_config
+            config=factory_config,
+            integration_id=integration.id
         )
 
         # Prepare metrics_config for IntegrationFactory.get_metrics
         # For the initial sync, we use default days and rely on config for project/board identifiers
         metrics_params = {"days": 30}
-        if integration.type == "jira" and integration.config and integration.config.get("project_key"):
-            metrics_params["project_key"] = integration.config["project_key"]
-        elif integration.type == "trello" and integration.config and integration.config.get("board_id"):
-            metrics_params["board_id"] = integration.config["board_id"]
+        if integration.type == "jira" and cfg.get("project_key"):
+            metrics_params["project_key"] = cfg["project_key"]
+        elif integration.type == "trello" and cfg.get("board_id"):
+            metrics_params["board_id"] = cfg["board_id"]
         
-        print(f"Calling get_metrics for {integration.type} with params: {metrics_params}")
+        logger.debug("Calling get_metrics for %s with params: %s", integration.type, metrics_params)
         
         try:
             # This call will use the cache if data is fresh, or populate it.
             metrics = IntegrationFactory.get_metrics(integration_instance, metrics_params)
-            print(f"Successfully fetched/calculated metrics for integration {integration_id}. Metrics keys: {list(metrics.keys()) if metrics else 'No metrics'}")
+            logger.info("Successfully fetched/calculated metrics for integration %s. Metrics keys: %s", integration_id, list(metrics.keys()) if metrics else "No metrics")
             integration.last_sync = func.now()
             integration.updated_at = func.now() # Also update updated_at
             db.commit()
-            print(f"Successfully updated last_sync for integration {integration_id}")
+            logger.info("Successfully updated last_sync for integration %s", integration_id)
         except ValueError as ve:
             # This can happen if project_key/board_id is required but not found for Jira/Trello
-            print(f"ValueError during metrics calculation for integration {integration_id} ({integration.type}): {str(ve)}. Integration may require further configuration.")
+            logger.warning("ValueError during metrics calculation for integration %s (%s): %s. Integration may require further configuration.", integration_id, integration.type, ve)
             # We can still update last_sync to indicate an attempt was made, or leave it
             # For now, let's update it, so it doesn't get picked up by a periodic "stale" checker too soon.
             integration.last_sync = func.now() 
             integration.updated_at = func.now()
             db.commit()
-            print(f"Updated last_sync for integration {integration_id} despite ValueError during metrics calculation.")
+            logger.info("Updated last_sync for integration %s despite ValueError during metrics calculation.", integration_id)
         except Exception as e:
-            print(f"Error during metrics calculation for integration {integration_id}: {str(e)}")
+            logger.error("Error during metrics calculation for integration %s: %s", integration_id, e)
             # Retry the task if it's a potentially transient error
             raise self.retry(exc=e)
 
     except Exception as e:
-        print(f"Unhandled exception in initial_sync_metrics_task for integration {integration_id}: {str(e)}")
+        logger.error("Unhandled exception in initial_sync_metrics_task for integration %s: %s", integration_id, e)
         # Retry the task if it's a potentially transient error (e.g. DB connection issue)
         # Ensure self.request.retries is available if not using bind=True
         # For now, using max_retries in @app.task decorator handles this.
@@ -104,95 +128,100 @@ def initial_sync_metrics_task(self, integration_id: int):
 
     finally:
         db.close()
-        print(f"Celery task initial_sync_metrics_task finished for integration_id: {integration_id}")
+        logger.info("Celery task initial_sync_metrics_task finished for integration_id: %s", integration_id)
+
+@app.task(ignore_result=True)
+def initial_sync_metrics_batch_task(integration_ids: list):
+    """
+    Dispatches the initial metrics sync for a batch of new integrations.
+    """
+    logger.info("Celery task initial_sync_metrics_batch_task started for %s integrations", len(integration_ids))
+    # One message from the API for the whole batch, then real subtasks here so
+    # each integration syncs in parallel and keeps its own retries
+    group(initial_sync_metrics_task.s(integration_id) for integration_id in integration_ids).apply_async()
+    logger.info("Celery task initial_sync_metrics_batch_task dispatched %s integrations", len(integration_ids))
+
+def save_metrics(db, integration: Integration, metrics: dict):
+    """
+    Persist the numeric metrics for an integration and bump its last_sync.
+    """
+    # Store each numeric metric, batched into a single executemany INSERT
+    metric_rows = [
+        {
+            "name": metric_name,
+            "category": integration.type,  # Use integration type as category
+            "value": float(metric_value),
+            "raw_data": metrics,  # Store all metrics as raw data
+            "team_id": integration.team_id,
+            "project_id": integration.project_id
+        }
+        for metric_name, metric_value in metrics.items()
+        if isinstance(metric_value, (int, float))
+    ]
+    if metric_rows:
+        db.execute(insert(Metric), metric_rows)
+    
+    # Update last sync with a plain UPDATE rather than dirtying the ORM row
+    db.execute(
+        update(Integration)
+        .where(Integration.id == integration.id)
+        .values(last_sync=func.now()),
+        execution_options={"synchronize_session": False}
+    )
+    db.commit()
+
+@app.task(bind=True, max_retries=3, default_retry_delay=60, ignore_result=True)
+def store_metrics_task(self, integration_id: int, metrics: dict):
+    """
+    Persists metrics fetched by the metrics endpoint, off the request path.
+    """
+    db = SessionLocal()
+    try:
+        integration = db.get(Integration, integration_id)
+        if not integration:
+            logger.error("Error: Integration with ID %s not found. Dropping %s metrics.", integration_id, len(metrics))
+            return
+        save_metrics(db, integration, metrics)
+        logger.info("Stored metrics for integration %s", integration_id)
+    except Exception as e:
+        db.rollback()
+        logger.error("Error storing metrics for integration %s: %s", integration_id, e)
+        raise self.retry(exc=e)
+    finally:
+        db.close()
 
-@app.task(bind=True, max_retries=2, default_retry_delay=300) # Retry a couple of times with 5min delay for the whole batch
+@app.task(bind=True, max_retries=2, default_retry_delay=300, ignore_result=True) # Retry a couple of times with 5min delay for the whole batch
 def periodic_sync_all_integrations_metrics_task(self):
     """
     Periodically syncs metrics for all active integrations.
     """
-    print("Celery Beat: periodic_sync_all_integrations_metrics_task started.")
+    logger.info("Celery Beat: periodic_sync_all_integrations_metrics_task started.")
     db = SessionLocal()
     try:
-        active_integrations = db.query(Integration).filter(Integration.active == True).all()
-        if not active_integrations:
-            print("Celery Beat: No active integrations found to sync.")
+        # Only the ids are needed here; each subtask loads its own integration
+        active_integration_ids = [
+            integration_id for (integration_id,) in
+            db.query(Integration.id).filter(Integration.active == True).all()
+        ]
+        # Hand the connection back before dispatching
+        db.close()
+        if not active_integration_ids:
+            logger.info("Celery Beat: No active integrations found to sync.")
             return
 
-        print(f"Celery Beat: Found {len(active_integrations)} active integrations to sync.")
-        successful_syncs = 0
-        failed_syncs = 0
-
-        for integration in active_integrations:
-            print(f"Celery Beat: Processing integration ID {integration.id} ({integration.name}, type: {integration.type})")
-            try:
-                # Prepare config for IntegrationFactory (similar to initial_sync_metrics_task)
-                factory_config = {
-                    "api_token": integration.api_key,
-                    "api_key": integration.api_key,
-                    "token": integration.api_key,
-                    "server": integration.api_url,
-                    "username": integration.username,
-                    "repository": integration.config.get("repository") if integration.config else None,
-                    "api_secret": integration.config.get("api_secret") if integration.config else None,
-                }
-                if integration.type == "trello" and integration.config:
-                    if 'api_key' in integration.config: factory_config['api_key'] = integration.config['api_key']
-                    if 'token' in integration.config: factory_config['token'] = integration.config['token']
-
-                integration_instance = IntegrationFactory.create_integration(
-                    integration_type=integration.type,
-                    config=factory_config
-                )
-
-                # Prepare metrics_params for IntegrationFactory.get_metrics
-                metrics_params = {"days": 30} # Default lookback period for periodic sync
-                
-                if integration.type == "jira":
-                    project_key = integration.config.get("project_key") if integration.config else None
-                    if not project_key:
-                        print(f"Warning: project_key not found in config for Jira integration ID {integration.id}. Skipping metrics sync.")
-                        failed_syncs +=1
-                        continue
-                    metrics_params["project_key"] = project_key
-                elif integration.type == "trello":
-                    board_id = integration.config.get("board_id") if integration.config else None
-                    if not board_id:
-                        print(f"Warning: board_id not found in config for Trello integration ID {integration.id}. Skipping metrics sync.")
-                        failed_syncs +=1
-                        continue
-                    metrics_params["board_id"] = board_id
-                
-                print(f"Celery Beat: Calling get_metrics for integration {integration.id} with params: {metrics_params}")
-                metrics = IntegrationFactory.get_metrics(integration_instance, metrics_params)
-                
-                integration.last_sync = func.now()
-                integration.updated_at = func.now()
-                db.commit()
-                successful_syncs += 1
-                print(f"Celery Beat: Successfully synced metrics for integration {integration.id}. Metrics keys: {list(metrics.keys()) if metrics else 'No metrics'}")
-
-            except ValueError as ve: # Catch errors from get_metrics if config is bad (e.g. missing key after all)
-                print(f"Celery Beat: ValueError during metrics sync for integration ID {integration.id}: {str(ve)}")
-                failed_syncs += 1
-                # Optionally update last_sync to now to prevent immediate re-attempts if the error is persistent config related
-                integration.last_sync = func.now() 
-                integration.updated_at = func.now()
-                db.commit()
-            except Exception as e:
-                print(f"Celery Beat: Error syncing metrics for integration ID {integration.id}: {str(e)}")
-                failed_syncs += 1
-                # Do not re-raise here to allow other integrations to sync. Error is logged.
-                # Consider if a specific integration should be marked as inactive after too many failures.
-
-        print(f"Celery Beat: Finished periodic sync. Successful: {successful_syncs}, Failed: {failed_syncs}")
+        # Fan out one sync per integration so workers fetch in parallel instead of
+        # this task fetching them one after another. Each subtask opens and closes
+        # its own session and retries on its own.
+        job = group(initial_sync_metrics_task.s(integration_id) for integration_id in active_integration_ids)
+        job.apply_async()
+        logger.info("Celery Beat: Dispatched metrics sync for %s active integrations.", len(active_integration_ids))
 
     except Exception as e:
-        print(f"Celery Beat: Unhandled exception in periodic_sync_all_integrations_metrics_task: {str(e)}")
+        logger.error("Celery Beat: Unhandled exception in periodic_sync_all_integrations_metrics_task: %s", e)
         raise self.retry(exc=e) # Retry the whole batch processing if a major error occurs
     finally:
         db.close()
-        print("Celery Beat: periodic_sync_all_integrations_metrics_task finished.")
+        logger.info("Celery Beat: periodic_sync_all_integrations_metrics_task finished.")
 
 # Configure Celery Beat Schedule
 app.conf.beat_schedule = {
@@ -1,20 +1,35 @@
 import os
+import logging
 import redis
-import json
+import orjson
 import functools
 import inspect # Import inspect
-from typing import Callable, Any
+from typing import Callable, Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
 
 # Initialize Redis connection
 redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 try:
-    redis_client = redis.Redis.from_url(redis_url)
+    # One bounded pool shared by every caller in the process (FastAPI threadpool, Celery worker)
+    redis_pool = redis.ConnectionPool.from_url(
+        redis_url,
+        max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    )
+    redis_client = redis.Redis(connection_pool=redis_pool)
     redis_client.ping()
-    print("Successfully connected to Redis for caching.")
+    logger.info("Successfully connected to Redis for caching.")
 except redis.exceptions.ConnectionError as e:
-    print(f"Warning: Could not connect to Redis for caching: {e}")
+    logger.warning("Could not connect to Redis for caching: %s", e)
     redis_client = None
 
+def dump_json(value: Any) -> bytes:
+    """
+    Serializes a value for Redis. orjson returns bytes, which setex takes as-is.
+    """
+    # Non-string keys are stringified as json.dumps did; datetimes and numpy values serialize natively
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
 def generate_cache_key(func: Callable, *args: Any, **kwargs: Any) -> str:
     """
     Generates a cache key based on the function name, instance attributes, and arguments.
@@ -40,77 +55,193 @@ def generate_cache_key(func: Callable, *args: Any, **kwargs: Any) -> str:
         
     return ":".join(key_parts)
 
+# Method arguments that define the scope of the data being fetched
+CACHE_KEY_PARAMS = ("project_key", "board_id", "days")
+
 def redis_cache(ttl_seconds: int = 1800): # Default TTL 30 minutes
     """
     Decorator to cache the result of a function in Redis.
     """
     def decorator(func: Callable):
+        # Resolve the signature once here rather than on every call. For each
+        # argument that scopes the fetched data, record where it can arrive
+        # positionally and its default, so calls don't need sig.bind()
+        key_params = []
+        positional = True
+        for index, param in enumerate(inspect.signature(func).parameters.values()):
+            if param.kind in (param.VAR_POSITIONAL, param.KEYWORD_ONLY):
+                positional = False
+            # The first parameter ('self') is covered by the class name
+            if index == 0 or param.name not in CACHE_KEY_PARAMS:
+                continue
+            default = None if param.default is param.empty else param.default
+            key_params.append((param.name, index if positional else None, default))
+
         @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any):
             if not redis_client:
-                print("Warning: Redis client not available. Bypassing cache.")
+                # Already warned once at import; don't repeat it on every call
+                logger.debug("Warning: Redis client not available. Bypassing cache.")
                 return func(*args, **kwargs)
 
-            # Adjust key generation based on actual method signature
-            # New cache key generation using inspect.signature
             instance = args[0] # Assuming the first argument is 'self'
             
             # Start key with class name and function name
             key_parts = [instance.__class__.__name__, func.__name__]
 
             # Handle GitHub's repository_name from instance attribute
-            if hasattr(instance, 'repository_name') and instance.repository_name:
-                key_parts.append(f"repository_name:{instance.repository_name}")
+            repository_name = getattr(instance, 'repository_name', None)
+            if repository_name:
+                key_parts.append(f"repository_name:{repository_name}")
 
-            sig = inspect.signature(func)
-            try:
-                bound_args = sig.bind(*args, **kwargs)
-            except TypeError as e:
-                # This can happen if a required arg is missing, though FastAPI/Pydantic usually catch this earlier.
-                # Or if *args/**kwargs don't match the signature at all.
-                print(f"Cache key generation error: Could not bind args for {func.__name__}: {e}")
-                # Fallback to a less specific key or re-raise, for now, log and make a simple key
-                key_parts.extend([str(arg) for arg in args[1:]]) # Skip self
-                key_parts.extend([f"{k}:{v}" for k, v in sorted(kwargs.items())])
-                final_cache_key = ":".join(filter(None, key_parts))
-            else:
-                bound_args.apply_defaults()
-                
-                # Iterate over all arguments including 'self'
-                first_param_name = next(iter(sig.parameters)) # Get the name of the first parameter (usually 'self')
-                
-                for name, value in bound_args.arguments.items():
-                    if name == first_param_name: # Skip 'self' as its class is already in key_parts
-                        continue
-                    
-                    # Only include relevant arguments by name for the cache key
-                    # These are typically the ones that define the scope of the data being fetched.
-                    if name in ['project_key', 'board_id', 'days'] and value is not None:
-                        key_parts.append(f"{name}:{str(value)}")
-                    # Example for other potential args, if any, that should be part of the key:
-                    # elif name == 'another_relevant_arg' and value is not None:
-                    #     key_parts.append(f"{name}:{str(value)}")
-
-                final_cache_key = ":".join(filter(None, key_parts))
-
-            print(f"Generated cache key for {func.__name__}: {final_cache_key}")
+            # Same values sig.bind() + apply_defaults() would give, in signature order
+            for name, index, default in key_params:
+                if name in kwargs:
+                    value = kwargs[name]
+                elif index is not None and index < len(args):
+                    value = args[index]
+                else:
+                    value = default
+                if value is not None:
+                    key_parts.append(f"{name}:{value}")
+
+            final_cache_key = ":".join(filter(None, key_parts))
+
+            logger.debug("Generated cache key for %s: %s", func.__name__, final_cache_key)
             
             try:
                 cached_result = redis_client.get(final_cache_key)
                 if cached_result:
-                    print(f"Cache hit for key: {final_cache_key}")
-                    return json.loads(cached_result)
+                    logger.debug("Cache hit for key: %s", final_cache_key)
+                    return orjson.loads(cached_result)
             except redis.exceptions.RedisError as e:
-                print(f"Redis error while getting cache: {e}. Bypassing cache.")
+                logger.warning("Redis error while getting cache: %s. Bypassing cache.", e)
 
-            print(f"Cache miss for key: {final_cache_key}. Calling function.")
+            logger.debug("Cache miss for key: %s. Calling function.", final_cache_key)
             result = func(*args, **kwargs)
             
             try:
-                redis_client.setex(final_cache_key, ttl_seconds, json.dumps(result))
+                redis_client.setex(final_cache_key, ttl_seconds, dump_json(result))
+            except TypeError as e:
+                logger.warning("Result for key %s is not JSON serializable, not caching: %s", final_cache_key, e)
             except redis.exceptions.RedisError as e:
-                print(f"Redis error while setting cache: {e}.")
+                logger.warning("Redis error while setting cache: %s.", e)
             
             return result
         return wrapper
     return decorator
+
+def get_cached_json(key: str) -> Any:
+    """
+    Returns the JSON value cached under key, or None on a miss or if Redis is unavailable.
+    """
+    if not redis_client:
+        return None
+
+    try:
+        cached_result = redis_client.get(key)
+    except redis.exceptions.RedisError as e:
+        logger.warning("Redis error while getting cache: %s. Bypassing cache.", e)
+        return None
+
+    return orjson.loads(cached_result) if cached_result else None
+
+def get_cached_json_many(keys: List[str]) -> List[Any]:
+    """
+    Fetches several JSON values in one MGET round trip; misses (or an unavailable Redis) come back as None.
+    """
+    if not redis_client or not keys:
+        return [None] * len(keys)
+
+    try:
+        cached_results = redis_client.mget(keys)
+    except redis.exceptions.RedisError as e:
+        logger.warning("Redis error while getting cache: %s. Bypassing cache.", e)
+        return [None] * len(keys)
+
+    return [orjson.loads(cached) if cached else None for cached in cached_results]
+
+def get_cached_bytes(key: str) -> Optional[bytes]:
+    """
+    Returns the raw cached JSON under key without decoding it, or None on a miss or if Redis is unavailable.
+    """
+    if not redis_client:
+        return None
+
+    try:
+        return redis_client.get(key) or None
+    except redis.exceptions.RedisError as e:
+        logger.warning("Redis error while getting cache: %s. Bypassing cache.", e)
+        return None
+
+def set_cached_json(key: str, value: Any, ttl_seconds: int) -> None:
+    """
+    Caches a JSON-serializable value under key for ttl_seconds.
+    """
+    if not redis_client:
+        return
+
+    try:
+        body = dump_json(value)
+    except (TypeError, ValueError) as e:
+        logger.warning("Value for key %s is not JSON serializable, not caching: %s", key, e)
+        return
+    set_cached_bytes(key, body, ttl_seconds)
+
+def set_cached_json_many(values: Dict[str, Any], ttl_seconds: int) -> None:
+    """
+    Caches several JSON-serializable values for ttl_seconds with one pipelined round trip.
+    """
+    if not redis_client or not values:
+        return
+
+    # Not MULTI/EXEC: the writes are independent, they only need to share the round trip
+    pipe = redis_client.pipeline(transaction=False)
+    for key, value in values.items():
+        try:
+            pipe.setex(key, ttl_seconds, dump_json(value))
+        except (TypeError, ValueError) as e:
+            logger.warning("Value for key %s is not JSON serializable, not caching: %s", key, e)
+
+    try:
+        pipe.execute()
+    except redis.exceptions.RedisError as e:
+        logger.warning("Redis error while setting cache: %s.", e)
+
+def set_cached_bytes(key: str, body: bytes, ttl_seconds: int) -> None:
+    """
+    Caches already-serialized JSON under key for ttl_seconds.
+    """
+    if not redis_client:
+        return
+
+    try:
+        redis_client.setex(key, ttl_seconds, body)
+    except redis.exceptions.RedisError as e:
+        logger.warning("Redis error while setting cache: %s.", e)
+
+def delete_cached(key: str) -> None:
+    """
+    Deletes a single cached key.
+    """
+    if not redis_client:
+        return
+
+    try:
+        redis_client.delete(key)
+    except redis.exceptions.RedisError as e:
+        logger.warning("Redis error while deleting cache key %s: %s.", key, e)
+
+def invalidate_cache_prefix(prefix: str) -> None:
+    """
+    Deletes every cached key starting with prefix (SCAN-based, so it never blocks Redis).
+    """
+    if not redis_client:
+        return
+
+    try:
+        keys = list(redis_client.scan_iter(match=f"{prefix}*"))
+        if keys:
+            redis_client.delete(*keys)
+    except redis.exceptions.RedisError as e:
+        logger.warning("Redis error while invalidating cache prefix %s: %s.", prefix, e)
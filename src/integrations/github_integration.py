@@ -1,14 +1,49 @@
 import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from github import Github
 from datetime import datetime, timedelta, timezone
 import pandas as pd
 from .cache import redis_cache # Import the decorator
 
+logger = logging.getLogger(__name__)
+
+# Page size for list endpoints (GitHub's maximum, PyGithub defaults to 30)
+GITHUB_PAGE_SIZE = 100
+# PR and commit details beyond the list payload (additions, stats, ...) are
+# lazy-loaded with one request each, so those lookups run this many at a time
+GITHUB_DETAIL_FETCH_WORKERS = 16
+
+# Listing columns; rows are built as tuples in this order so the DataFrame is
+# constructed column-wise instead of inferring keys from a dict per row
+PR_COLUMNS = ["id", "title", "state", "created_at", "closed_at", "merged_at", "user",
+              "additions", "deletions", "changed_files", "comments", "review_comments"]
+COMMIT_COLUMNS = ["sha", "author", "message", "date", "additions", "deletions", "total_changes"]
+ISSUE_COLUMNS = ["id", "title", "state", "created_at", "closed_at", "user", "labels", "comments"]
+
+NANOSECONDS_PER_HOUR = 3.6e12
+
+def _mean_hours_between(start, end, mask):
+    """Mean of end - start in hours over the rows selected by mask, on raw int64 nanoseconds"""
+    # datetime64[ns] (UTC for tz-aware columns) viewed as integers skips the
+    # Timedelta series and .dt accessor round trip
+    start_ns = start.to_numpy(dtype="datetime64[ns]").view("i8")[mask]
+    end_ns = end.to_numpy(dtype="datetime64[ns]").view("i8")[mask]
+    return float((end_ns - start_ns).mean() / NANOSECONDS_PER_HOUR)
+
+def _map_concurrently(fn, items):
+    """Apply fn to each item in a thread pool, keeping the input order"""
+    if len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(GITHUB_DETAIL_FETCH_WORKERS, len(items))) as executor:
+        return list(executor.map(fn, items))
+
 class GitHubIntegration:
     def __init__(self, api_token=None, repository=None):
         self.api_token = api_token or os.getenv("GITHUB_TOKEN")
         self.repository_name = repository
         self.github = Github(self.api_token)
+        self.github.per_page = GITHUB_PAGE_SIZE
         self.repository = None
         
         if self.repository_name:
@@ -17,20 +52,34 @@ class GitHubIntegration:
     def set_repository(self, repository_name):
         """Set the repository to analyze"""
         if not repository_name:
-            print("Warning: Empty repository name provided")
+            logger.warning("Empty repository name provided")
             raise ValueError("Repository name cannot be empty")
             
         self.repository_name = repository_name
         
         try:
-            print(f"Trying to get repository: {repository_name}")
+            logger.debug("Trying to get repository: %s", repository_name)
             self.repository = self.github.get_repo(repository_name)
-            print(f"Successfully initialized repository: {repository_name}")
+            logger.debug("Successfully initialized repository: %s", repository_name)
             return self.repository
         except Exception as e:
-            print(f"Error getting repository {repository_name}: {str(e)}")
+            logger.warning("Error getting repository %s: %s", repository_name, e)
             raise ValueError(f"Could not access repository: {str(e)}")
     
+    def get_repositories(self):
+        """Get repositories the authenticated user has access to"""
+        # Every field used here is part of the list payload, so this costs
+        # one request per page of repositories and no per-repo lookups
+        repos = self.github.get_user().get_repos(sort="updated")
+        
+        return [{
+            "id": repo.full_name,
+            "name": repo.full_name,
+            "description": repo.description,
+            "private": repo.private,
+            "url": repo.html_url
+        } for repo in repos]
+    
     def get_pull_requests(self, state="all", days=30):
         """Get pull requests from the repository"""
         if not self.repository:
@@ -39,27 +88,31 @@ class GitHubIntegration:
         since = datetime.now(timezone.utc) - timedelta(days=days)
         pull_requests = self.repository.get_pulls(state=state, sort="created", direction="desc")
         
-        pr_data = []
+        recent_prs = []
         for pr in pull_requests:
+            # Newest first, so everything from here on is older; stop paging
             if pr.created_at < since:
-                continue
-                
-            pr_data.append({
-                "id": pr.number,
-                "title": pr.title,
-                "state": pr.state,
-                "created_at": pr.created_at,
-                "closed_at": pr.closed_at,
-                "merged_at": pr.merged_at,
-                "user": pr.user.login,
-                "additions": pr.additions,
-                "deletions": pr.deletions,
-                "changed_files": pr.changed_files,
-                "comments": pr.comments,
-                "review_comments": pr.review_comments
-            })
+                break
+            recent_prs.append(pr)
+        
+        # The size and review fields aren't in the list payload; each PR
+        # fetches them on first access, so build the rows concurrently
+        pr_data = _map_concurrently(lambda pr: (
+            pr.number,
+            pr.title,
+            pr.state,
+            pr.created_at,
+            pr.closed_at,
+            pr.merged_at,
+            pr.user.login,
+            pr.additions,
+            pr.deletions,
+            pr.changed_files,
+            pr.comments,
+            pr.review_comments
+        ), recent_prs)
             
-        return pd.DataFrame(pr_data)
+        return pd.DataFrame.from_records(pr_data, columns=PR_COLUMNS)
     
     def get_commits(self, days=30):
         """Get commits from the repository"""
@@ -67,23 +120,24 @@ class GitHubIntegration:
             raise ValueError("Repository not set")
             
         since = datetime.now(timezone.utc) - timedelta(days=days)
-        commits = self.repository.get_commits(since=since)
+        commits = list(self.repository.get_commits(since=since))
         
-        commit_data = []
-        for commit in commits:
+        def commit_row(commit):
+            # stats is one request per commit
             stats = commit.stats
+            return (
+                commit.sha,
+                commit.author.login if commit.author else "Unknown",
+                commit.commit.message,
+                commit.commit.author.date,
+                stats.additions,
+                stats.deletions,
+                stats.total
+            )
+        
+        commit_data = _map_concurrently(commit_row, commits)
             
-            commit_data.append({
-                "sha": commit.sha,
-                "author": commit.author.login if commit.author else "Unknown",
-                "message": commit.commit.message,
-                "date": commit.commit.author.date,
-                "additions": stats.additions,
-                "deletions": stats.deletions,
-                "total_changes": stats.total
-            })
-            
-        return pd.DataFrame(commit_data)
+        return pd.DataFrame.from_records(commit_data, columns=COMMIT_COLUMNS)
     
     def get_issues(self, state="all", days=30):
         """Get issues from the repository"""
@@ -91,57 +145,60 @@ class GitHubIntegration:
             raise ValueError("Repository not set")
             
         since = datetime.now(timezone.utc) - timedelta(days=days)
-        issues = self.repository.get_issues(state=state, sort="created", direction="desc")
+        # since= filters on updated time server-side, which drops stale issues
+        # but not old ones touched recently, so the created check stays
+        issues = self.repository.get_issues(state=state, sort="created", direction="desc", since=since)
         
         issue_data = []
         for issue in issues:
-            if issue.pull_request:  # Skip pull requests
-                continue
-                
+            # Newest first, so everything from here on is older; stop paging
             if issue.created_at < since:
+                break
+                
+            if issue.pull_request:  # Skip pull requests
                 continue
                 
-            issue_data.append({
-                "id": issue.number,
-                "title": issue.title,
-                "state": issue.state,
-                "created_at": issue.created_at,
-                "closed_at": issue.closed_at,
-                "user": issue.user.login,
-                "labels": [label.name for label in issue.labels],
-                "comments": issue.comments
-            })
+            issue_data.append((
+                issue.number,
+                issue.title,
+                issue.state,
+                issue.created_at,
+                issue.closed_at,
+                issue.user.login,
+                [label.name for label in issue.labels],
+                issue.comments
+            ))
             
-        return pd.DataFrame(issue_data)
+        return pd.DataFrame.from_records(issue_data, columns=ISSUE_COLUMNS)
     
     @redis_cache(ttl_seconds=1800) # Cache for 30 minutes
     def calculate_metrics(self, days=30):
         """Calculate metrics from GitHub data"""
-        print(f"Calculating GitHub metrics for repository {self.repository_name} over {days} days (cacheable)")
+        logger.debug("Calculating GitHub metrics for repository %s over %s days (cacheable)", self.repository_name, days)
         
         try:
             prs = self.get_pull_requests(days=days)
-            print(f"Found {len(prs) if not prs.empty else 0} pull requests")
+            logger.debug("Found %s pull requests", len(prs))
             
             commits = self.get_commits(days=days)
-            print(f"Found {len(commits) if not commits.empty else 0} commits")
+            logger.debug("Found %s commits", len(commits))
             
             issues = self.get_issues(days=days)
-            print(f"Found {len(issues) if not issues.empty else 0} issues")
+            logger.debug("Found %s issues", len(issues))
             
             metrics = {}
             
             # PR metrics
             if not prs.empty:
-                merged_prs = prs[prs["merged_at"].notnull()]
+                merged = prs["merged_at"].notnull().to_numpy()
+                merged_count = int(merged.sum())
                 
                 # Time to merge
-                if not merged_prs.empty:
-                    merged_prs["time_to_merge"] = (merged_prs["merged_at"] - merged_prs["created_at"]).dt.total_seconds() / 3600
-                    metrics["avg_time_to_merge_hours"] = merged_prs["time_to_merge"].mean()
+                if merged_count:
+                    metrics["avg_time_to_merge_hours"] = _mean_hours_between(prs["created_at"], prs["merged_at"], merged)
                     
                 metrics["pr_count"] = len(prs)
-                metrics["pr_merge_rate"] = len(merged_prs) / len(prs) if len(prs) > 0 else 0
+                metrics["pr_merge_rate"] = merged_count / len(prs) if len(prs) > 0 else 0
                 
             # Commit metrics
             if not commits.empty:
@@ -154,15 +211,15 @@ class GitHubIntegration:
                 
             # Issue metrics
             if not issues.empty:
-                closed_issues = issues[issues["closed_at"].notnull()]
+                closed = issues["closed_at"].notnull().to_numpy()
+                closed_count = int(closed.sum())
                 
                 # Time to close
-                if not closed_issues.empty:
-                    closed_issues["time_to_close"] = (closed_issues["closed_at"] - closed_issues["created_at"]).dt.total_seconds() / 3600
-                    metrics["avg_time_to_close_hours"] = closed_issues["time_to_close"].mean()
+                if closed_count:
+                    metrics["avg_time_to_close_hours"] = _mean_hours_between(issues["created_at"], issues["closed_at"], closed)
                     
                 metrics["issue_count"] = len(issues)
-                metrics["issue_close_rate"] = len(closed_issues) / len(issues) if len(issues) > 0 else 0
+                metrics["issue_close_rate"] = closed_count / len(issues) if len(issues) > 0 else 0
                 
             # If no metrics were calculated, add a placeholder to avoid returning empty object
             if not metrics:
@@ -172,15 +229,15 @@ class GitHubIntegration:
                 metrics["pr_count"] = 0
                 metrics["commit_count"] = 0
                 metrics["issue_count"] = 0
-                print(f"No metrics calculated for {self.repository_name}: No recent activity")
+                logger.debug("No metrics calculated for %s: No recent activity", self.repository_name)
             else:
                 metrics["status"] = "active"
-                print(f"Calculated metrics for {self.repository_name}: {', '.join(metrics.keys())}")
+                logger.debug("Calculated metrics for %s: %s", self.repository_name, ", ".join(metrics))
                 
             return metrics
         
         except Exception as e:
-            print(f"Error calculating GitHub metrics for {self.repository_name}: {str(e)}")
+            logger.warning("Error calculating GitHub metrics for %s: %s", self.repository_name, e)
             # Return a metrics object with the error
             return {
                 "error": True,
@@ -1,7 +1,129 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+
 from src.integrations.github_integration import GitHubIntegration
 from src.integrations.jira_integration import JiraIntegration
 from src.integrations.trello_integration import TrelloIntegration
 
+logger = logging.getLogger(__name__)
+
+# Process-wide cache of integration instances, keyed on (type, config hash)
+# so a changed config never reuses a stale client, even across workers
+INSTANCE_CACHE_TTL_SECONDS = 600
+INSTANCE_CACHE_MAX_SIZE = 256
+_instance_cache = {}
+# Integration ID -> cache key, to evict without knowing the old config
+_instance_cache_ids = {}
+_instance_cache_lock = threading.Lock()
+
+def _instance_cache_key(integration_type, config):
+    """Build a cache key without keeping the raw credentials in it"""
+    config_hash = hashlib.sha256(
+        json.dumps(config or {}, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return integration_type.lower(), config_hash
+
+def _create_github(config):
+    # Check for different token field names
+    api_token = config.get("api_token") or config.get("token") or config.get("api_key")
+    
+    # Get repository from config
+    repository = config.get("repository")
+    
+    # Print debug info
+    logger.debug("Creating GitHub integration with repository: %s", repository)
+    
+    return GitHubIntegration(
+        api_token=api_token,
+        repository=repository
+    )
+
+def _create_jira(config):
+    return JiraIntegration(
+        server=config.get("server"),
+        username=config.get("username"),
+        api_token=config.get("api_token") or config.get("token") or config.get("api_key")
+    )
+
+def _create_trello(config):
+    # Get API key from config, falling back to api_token if not found
+    api_key = config.get("api_key") or config.get("api_token")
+    return TrelloIntegration(
+        api_key=api_key,
+        api_secret=config.get("api_secret"),
+        token=config.get("token")
+    )
+
+def _github_metrics(integration_instance, config):
+    days = config.get("days", 30)
+    return integration_instance.calculate_metrics(days=days)
+
+def _jira_metrics(integration_instance, config):
+    project_key = config.get("project_key")
+    days = config.get("days", 30)
+    
+    if not project_key:
+        raise ValueError("project_key is required for Jira metrics")
+        
+    return integration_instance.calculate_metrics(project_key=project_key, days=days)
+
+def _trello_metrics(integration_instance, config):
+    board_id = config.get("board_id")
+    days = config.get("days", 30)
+    
+    if not board_id:
+        raise ValueError("board_id is required for Trello metrics")
+        
+    return integration_instance.calculate_metrics(board_id=board_id, days=days)
+
+# Lookup tables for create_integration (by lowercased type) and get_metrics (by class)
+_INTEGRATION_BUILDERS = {
+    "github": _create_github,
+    "jira": _create_jira,
+    "trello": _create_trello,
+}
+_METRICS_HANDLERS = {
+    GitHubIntegration: _github_metrics,
+    JiraIntegration: _jira_metrics,
+    TrelloIntegration: _trello_metrics,
+}
+
+# Metric names and descriptions per integration type, built once at import
+SUPPORTED_METRICS = {
+    "github": {
+        "pr_count": "Number of pull requests in the period",
+        "pr_merge_rate": "Percentage of pull requests that were merged",
+        "avg_time_to_merge_hours": "Average time to merge pull requests (hours)",
+        "commit_count": "Number of commits in the period",
+        "avg_commit_size": "Average size of commits (lines changed)",
+        "author_distribution": "Distribution of commits by author",
+        "issue_count": "Number of issues in the period",
+        "issue_close_rate": "Percentage of issues that were closed",
+        "avg_time_to_close_hours": "Average time to close issues (hours)"
+    },
+    "jira": {
+        "issue_counts_by_type": "Number of issues by type",
+        "issue_counts_by_status": "Number of issues by status",
+        "completed_story_points": "Total story points completed",
+        "assignee_distribution": "Distribution of issues by assignee",
+        "active_sprint_count": "Number of active sprints",
+        "completed_sprint_count": "Number of completed sprints"
+    },
+    "trello": {
+        "card_counts_by_list": "Number of cards in each list",
+        "closed_card_count": "Number of closed cards",
+        "open_card_count": "Number of open cards",
+        "cards_with_due_count": "Number of cards with due dates",
+        "overdue_card_count": "Number of overdue cards",
+        "avg_checklist_completion": "Average checklist completion percentage",
+        "label_distribution": "Distribution of cards by label",
+        "member_distribution": "Distribution of cards by member"
+    },
+}
+
 class IntegrationFactory:
     """Factory for creating integration instances based on integration type"""
     
@@ -22,37 +144,59 @@ class IntegrationFactory:
             
         # Standardize integration type to lowercase for case-insensitive comparison
         integration_type = integration_type.lower()
-            
-        if integration_type == "github":
-            # Check for different token field names
-            api_token = config.get("api_token") or config.get("token") or config.get("api_key")
-            
-            # Get repository from config
-            repository = config.get("repository")
-            
-            # Print debug info
-            print(f"Creating GitHub integration with repository: {repository} and token: {'*' * 8}")
-            
-            return GitHubIntegration(
-                api_token=api_token,
-                repository=repository
-            )
-        elif integration_type == "jira":
-            return JiraIntegration(
-                server=config.get("server"),
-                username=config.get("username"),
-                api_token=config.get("api_token") or config.get("token") or config.get("api_key")
-            )
-        elif integration_type == "trello":
-            # Get API key from config, falling back to api_token if not found
-            api_key = config.get("api_key") or config.get("api_token")
-            return TrelloIntegration(
-                api_key=api_key,
-                api_secret=config.get("api_secret"),
-                token=config.get("token")
-            )
-        else:
+        builder = _INTEGRATION_BUILDERS.get(integration_type)
+        if builder is None:
             raise ValueError(f"Unsupported integration type: {integration_type}")
+        return builder(config)
+    
+    @staticmethod
+    def get_or_create_integration(integration_type, config=None, integration_id=None):
+        """
+        Return a cached integration instance for this type and config, creating it if needed
+        
+        Client construction talks to the provider (e.g. GitHub repository lookup,
+        Jira server handshake), so instances are reused for INSTANCE_CACHE_TTL_SECONDS.
+        
+        Args:
+            integration_type (str): Type of integration (github, jira, trello)
+            config (dict): Configuration parameters for the integration
+            integration_id (int): ID of the integration row, used for eviction
+            
+        Returns:
+            Integration instance
+        """
+        key = _instance_cache_key(integration_type, config)
+        now = time.monotonic()
+        
+        with _instance_cache_lock:
+            cached = _instance_cache.get(key)
+            if cached and cached[0] > now:
+                return cached[1]
+        
+        instance = IntegrationFactory.create_integration(integration_type, config)
+        
+        with _instance_cache_lock:
+            if key not in _instance_cache and len(_instance_cache) >= INSTANCE_CACHE_MAX_SIZE:
+                # Drop the oldest entry to keep the cache bounded
+                _instance_cache.pop(next(iter(_instance_cache)))
+            _instance_cache[key] = (now + INSTANCE_CACHE_TTL_SECONDS, instance)
+            if integration_id is not None:
+                _instance_cache_ids[integration_id] = key
+        
+        return instance
+    
+    @staticmethod
+    def evict_integration(integration_id):
+        """
+        Drop the cached instance for an integration, e.g. after it was updated or deleted
+        
+        Args:
+            integration_id (int): ID of the integration row
+        """
+        with _instance_cache_lock:
+            key = _instance_cache_ids.pop(integration_id, None)
+            if key is not None:
+                _instance_cache.pop(key, None)
     
     @staticmethod
     def get_metrics(integration_instance, config=None):
@@ -69,31 +213,16 @@ class IntegrationFactory:
         if not config:
             config = {}
             
-        # Determine the type of integration and call the appropriate method
-        if isinstance(integration_instance, GitHubIntegration):
-            days = config.get("days", 30)
-            return integration_instance.calculate_metrics(days=days)
-        
-        elif isinstance(integration_instance, JiraIntegration):
-            project_key = config.get("project_key")
-            days = config.get("days", 30)
-            
-            if not project_key:
-                raise ValueError("project_key is required for Jira metrics")
-                
-            return integration_instance.calculate_metrics(project_key=project_key, days=days)
-        
-        elif isinstance(integration_instance, TrelloIntegration):
-            board_id = config.get("board_id")
-            days = config.get("days", 30)
-            
-            if not board_id:
-                raise ValueError("board_id is required for Trello metrics")
-                
-            return integration_instance.calculate_metrics(board_id=board_id, days=days)
-        
-        else:
+        # Dispatch on the exact class first; fall back to isinstance for subclasses
+        handler = _METRICS_HANDLERS.get(type(integration_instance))
+        if handler is None:
+            handler = next(
+                (h for cls, h in _METRICS_HANDLERS.items() if isinstance(integration_instance, cls)),
+                None
+            )
+        if handler is None:
             raise ValueError(f"Unsupported integration type: {type(integration_instance)}")
+        return handler(integration_instance, config)
             
     @staticmethod
     def get_supported_metrics(integration_type):
@@ -104,39 +233,9 @@ class IntegrationFactory:
             integration_type (str): Type of integration (github, jira, trello)
             
         Returns:
-            dict: Dictionary of metric names and descriptions
+            dict: Dictionary of metric names and descriptions (shared, do not mutate)
         """
-        if integration_type.lower() == "github":
-            return {
-                "pr_count": "Number of pull requests in the period",
-                "pr_merge_rate": "Percentage of pull requests that were merged",
-                "avg_time_to_merge_hours": "Average time to merge pull requests (hours)",
-                "commit_count": "Number of commits in the period",
-                "avg_commit_size": "Average size of commits (lines changed)",
-                "author_distribution": "Distribution of commits by author",
-                "issue_count": "Number of issues in the period",
-                "issue_close_rate": "Percentage of issues that were closed",
-                "avg_time_to_close_hours": "Average time to close issues (hours)"
-            }
-        elif integration_type.lower() == "jira":
-            return {
-                "issue_counts_by_type": "Number of issues by type",
-                "issue_counts_by_status": "Number of issues by status",
-                "completed_story_points": "Total story points completed",
-                "assignee_distribution": "Distribution of issues by assignee",
-                "active_sprint_count": "Number of active sprints",
-                "completed_sprint_count": "Number of completed sprints"
-            }
-        elif integration_type.lower() == "trello":
-            return {
-                "card_counts_by_list": "Number of cards in each list",
-                "closed_card_count": "Number of closed cards",
-                "open_card_count": "Number of open cards",
-                "cards_with_due_count": "Number of cards with due dates",
-                "overdue_card_count": "Number of overdue cards",
-                "avg_checklist_completion": "Average checklist completion percentage",
-                "label_distribution": "Distribution of cards by label",
-                "member_distribution": "Distribution of cards by member"
-            }
-        else:
-            raise ValueError(f"Unsupported integration type: {integration_type}") 
\ No newline at end of file
+        supported = SUPPORTED_METRICS.get(integration_type.lower())
+        if supported is None:
+            raise ValueError(f"Unsupported integration type: {integration_type}")
+        return supported
\ No newline at end of file
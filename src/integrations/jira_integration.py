@@ -4,6 +4,9 @@ from datetime import datetime, timedelta
 import pandas as pd
 from .cache import redis_cache # Import the decorator
 
+# Only the fields get_issues reads; transitions come back via expand in the same search
+ISSUE_FIELDS = "summary,status,issuetype,priority,created,updated,assignee,reporter,customfield_10001,customfield_10002"
+
 class JiraIntegration:
     def __init__(self, server=None, username=None, api_token=None):
         self.server = server or os.getenv("JIRA_SERVER")
@@ -44,12 +47,12 @@ class JiraIntegration:
         since_str = since.strftime("%Y-%m-%d")
         
         jql = f"project = {project_key} AND created >= {since_str} ORDER BY created DESC"
-        issues = self.jira.search_issues(jql, maxResults=max_results)
+        issues = self.jira.search_issues(jql, maxResults=max_results, fields=ISSUE_FIELDS, expand="transitions")
         
         issue_data = []
         for issue in issues:
-            # Get transitions
-            transitions = self.jira.transitions(issue)
+            # Transitions were expanded in the search, so no per-issue request
+            transitions = issue.raw.get("transitions") or []
             transition_data = [{
                 "id": t["id"],
                 "name": t["name"],
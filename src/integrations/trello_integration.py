@@ -1,9 +1,12 @@
 import os
+import logging
 import requests
 from datetime import datetime, timedelta
 import pandas as pd
 from .cache import redis_cache # Import the decorator
 
+logger = logging.getLogger(__name__)
+
 class TrelloIntegration:
     def __init__(self, api_key=None, api_secret=None, token=None):
         self.api_key = api_key or os.getenv("TRELLO_API_KEY")
@@ -38,9 +41,9 @@ class TrelloIntegration:
                 "url": board.get('url', '')
             } for board in boards])
         except requests.exceptions.RequestException as e:
-            print(f"Error in get_boards: {str(e)}")
+            logger.warning("Error in get_boards: %s", e)
             if hasattr(e.response, 'text'):
-                print(f"Response text: {e.response.text}")
+                logger.warning("Response text: %s", e.response.text)
             raise ValueError(f"Failed to fetch Trello boards: {str(e)}")
     
     def get_lists(self, board_id):
@@ -63,9 +66,9 @@ class TrelloIntegration:
                 "pos": lst.get('pos', 0)
             } for lst in lists])
         except requests.exceptions.RequestException as e:
-            print(f"Error in get_lists: {str(e)}")
+            logger.warning("Error in get_lists: %s", e)
             if hasattr(e.response, 'text'):
-                print(f"Response text: {e.response.text}")
+                logger.warning("Response text: %s", e.response.text)
             raise ValueError(f"Failed to fetch Trello lists: {str(e)}")
     
     def get_cards(self, board_id, days=30):
@@ -125,9 +128,9 @@ class TrelloIntegration:
                 
             return pd.DataFrame(card_data)
         except requests.exceptions.RequestException as e:
-            print(f"Error in get_cards: {str(e)}")
+            logger.warning("Error in get_cards: %s", e)
             if hasattr(e.response, 'text'):
-                print(f"Response text: {e.response.text}")
+                logger.warning("Response text: %s", e.response.text)
             raise ValueError(f"Failed to fetch Trello cards: {str(e)}")
     
     @redis_cache(ttl_seconds=1800) # Cache for 30 minutes
@@ -138,7 +141,7 @@ class TrelloIntegration:
         if not hasattr(self, 'board_id') or self.board_id != board_id:
             self.board_id = board_id
             
-        print(f"Calculating Trello metrics for board {board_id} over {days} days (cacheable)")
+        logger.debug("Calculating Trello metrics for board %s over %s days (cacheable)", board_id, days)
         lists = self.get_lists(board_id)
         cards = self.get_cards(board_id, days)
         
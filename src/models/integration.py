@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -6,6 +6,13 @@ from src.backend.database import Base
 
 class Integration(Base):
     __tablename__ = "integrations"
+    __table_args__ = (
+        Index("ix_integration_type_project", "type", "project_id"),
+        # Active-integration lookups for the project/team metrics dashboards;
+        # both also serve plain project_id / team_id filters
+        Index("ix_integration_project_active", "project_id", "active"),
+        Index("ix_integration_team_active", "team_id", "active"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
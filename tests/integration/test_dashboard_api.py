@@ -307,4 +307,25 @@ def test_dashboard_without_integrations(authenticated_client):
     data = response.json()
     assert "message" in data
     assert "No integrations found" in data["message"]
-    assert data["integrations_count"] == 0 
\ No newline at end of file
+    assert data["integrations_count"] == 0 
+
+# Test that a repeated team metrics request is served from the aggregate cache
+@patch('src.integrations.integration_factory.IntegrationFactory.create_integration')
+@patch('src.integrations.integration_factory.IntegrationFactory.get_metrics')
+def test_get_team_metrics_cached(mock_get_metrics, mock_create_integration, dashboard_test_data):
+    client = dashboard_test_data[0]
+    # Read the ID fresh; the fixture's objects may already be detached from their session
+    team_id = TestingSessionLocal().query(Team.id).scalar()
+    mock_get_metrics.return_value = {"pr_count": 5, "pr_merge_rate": 0.5}
+    
+    # Back the team router's cache helpers with a dict instead of Redis
+    cache = {}
+    with patch('src.backend.routes.teams.get_cached_bytes', side_effect=cache.get), \
+         patch('src.backend.routes.teams.set_cached_bytes', side_effect=lambda key, body, ttl: cache.__setitem__(key, body)):
+        first = client.get(f"/teams/{team_id}/metrics")
+        second = client.get(f"/teams/{team_id}/metrics")
+    
+    assert first.status_code == 200
+    assert second.json() == first.json()
+    # The second request never fanned out to the integrations
+    assert mock_get_metrics.call_count == 2
@@ -0,0 +1,116 @@
+import pytest
+from fastapi import status
+from unittest.mock import patch
+from datetime import datetime, timezone
+
+from src.models.integration import Integration
+from src.backend.routes.integrations import IntegrationResponse, integration_to_dict
+
+@pytest.mark.integration
+@pytest.mark.api
+class TestBulkIntegrationsAPI:
+    """Integration tests for POST /integrations/bulk"""
+
+    def _integration(self, name, project_id, integration_type="github"):
+        return {
+            "name": name,
+            "type": integration_type,
+            "api_key": "test_api_key",
+            "project_id": project_id,
+            "config": {"repository": "test/repo"}
+        }
+
+    @patch('src.backend.routes.integrations.initial_sync_metrics_batch_task')
+    def test_bulk_create_mixed_projects(self, mock_batch_task, client, sample_project_data):
+        """Existing project ids are kept and missing ones fall back to a default project"""
+        project_id = client.post("/projects/", json=sample_project_data).json()["id"]
+        missing_project_id = 99999
+
+        response = client.post("/integrations/bulk", json=[
+            self._integration("Bulk Existing", project_id),
+            self._integration("Bulk Missing", missing_project_id),
+        ])
+
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()
+        assert [item["name"] for item in data] == ["Bulk Existing", "Bulk Missing"]
+        assert data[0]["project_id"] == project_id
+        assert data[1]["project_id"] not in (project_id, missing_project_id)
+        assert client.get(f"/projects/{data[1]['project_id']}").json()["name"] == "Default Project"
+
+        # The whole batch is queued with a single message
+        mock_batch_task.delay.assert_called_once_with([item["id"] for item in data])
+
+    @patch('src.backend.routes.integrations.initial_sync_metrics_batch_task')
+    def test_bulk_create_unsupported_type(self, mock_batch_task, client, sample_project_data):
+        """An unsupported type rejects the whole batch before anything is created"""
+        project_id = client.post("/projects/", json=sample_project_data).json()["id"]
+
+        response = client.post("/integrations/bulk", json=[
+            self._integration("Bulk Valid", project_id),
+            self._integration("Bulk Invalid", project_id, integration_type="gitlab"),
+        ])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "Unsupported integration type" in response.json()["detail"]
+        mock_batch_task.delay.assert_not_called()
+
+
+
+@pytest.mark.integration
+@pytest.mark.api
+class TestIntegrationsListAPI:
+    """Integration tests for keyset pagination on GET /integrations/"""
+
+    @patch('src.backend.routes.integrations.initial_sync_metrics_batch_task')
+    def test_cursor_pages_through_to_the_end(self, mock_batch_task, client, sample_project_data):
+        """Following next_cursor visits every integration once, in ID order"""
+        project_id = client.post("/projects/", json=sample_project_data).json()["id"]
+        created = client.post("/integrations/bulk", json=[{
+            "name": f"Paged Integration {i}",
+            "type": "github",
+            "api_key": "test_api_key",
+            "project_id": project_id,
+            "config": {"repository": "test/repo"}
+        } for i in range(5)]).json()
+        created_ids = [item["id"] for item in created]
+
+        seen_ids = []
+        response = client.get("/integrations/", params={"limit": 2, "include_total": True})
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            data = response.json()
+            assert len(data["items"]) <= 2
+            seen_ids.extend(item["id"] for item in data["items"])
+            if data["next_cursor"] is None:
+                break
+            response = client.get("/integrations/", params={"limit": 2, "cursor": data["next_cursor"], "include_total": True})
+
+        assert seen_ids == sorted(set(seen_ids))
+        assert set(created_ids) <= set(seen_ids)
+        # Paging ended only once every row had been returned
+        assert data["total_count"] == len(seen_ids)
+
+        # skip is the fallback for clients without a cursor
+        skipped = client.get("/integrations/", params={"skip": 1, "limit": 2}).json()
+        assert [item["id"] for item in skipped["items"]] == seen_ids[1:3]
+        assert skipped["total_count"] is None
+
+    def test_last_sync_matches_detail_format(self):
+        """The list endpoint formats last_sync the same way as the pydantic-validated endpoints"""
+        integration = Integration(
+            id=1, name="Synced Integration", type="github", project_id=1, team_id=1, active=True,
+            config={}, last_sync=datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc)
+        )
+
+        listed = integration_to_dict(integration)["last_sync"]
+        detail = IntegrationResponse.model_validate(integration).model_dump(mode="json")["last_sync"]
+
+        assert listed == detail == "2024-01-01T12:30:00Z"
+
+    def test_invalid_cursor(self, client):
+        """A malformed cursor is rejected with 400"""
+        response = client.get("/integrations/", params={"cursor": "not-a-cursor!"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == "Invalid cursor"
@@ -132,3 +132,27 @@ class TestJiraIntegrationCaching:
         # Clean up the cache key
         redis_client_instance.delete(expected_cache_key)
         print(f"Cleaned up Jira cache key: {expected_cache_key}")
+
+
+@pytest.mark.integration
+@pytest.mark.jira
+class TestJiraIssues:
+    """Integration tests for Jira issue retrieval"""
+
+    @patch('src.integrations.jira_integration.JIRA')
+    def test_get_issues_reads_expanded_transitions(self, mock_jira_constructor):
+        """Transitions come from the expanded search, not one request per issue."""
+        mock_jira_api = MagicMock()
+        mock_jira_constructor.return_value = mock_jira_api
+
+        mock_issue = MagicMock(id="1001", key="PROJ-1")
+        mock_issue.fields.created = "2023-01-01T10:00:00.000+0000"
+        mock_issue.raw = {"transitions": [{"id": "31", "name": "Done", "to": {"name": "Done"}}]}
+        mock_jira_api.search_issues.return_value = [mock_issue]
+
+        integration = JiraIntegration(server="https://test.jira.com", username="user", api_token="token")
+        issues = integration.get_issues("PROJ")
+
+        mock_jira_api.transitions.assert_not_called()
+        assert mock_jira_api.search_issues.call_args.kwargs["expand"] == "transitions"
+        assert issues.iloc[0]["transitions"] == [{"id": "31", "name": "Done", "to_status": "Done"}]
@@ -98,4 +98,56 @@ class TestProjectsAPI:
         # Verify the project is now inactive
         get_response = client.get(f"/projects/{project_id}")
         assert get_response.status_code == status.HTTP_200_OK
-        assert get_response.json()["active"] is False 
\ No newline at end of file
+        assert get_response.json()["active"] is False
+    
+    def test_get_project_cached_and_invalidated_on_update(self, client, sample_project_data, mocker):
+        """Test that a cached project is dropped when the project is updated"""
+        # Back the cache helpers with a dict instead of Redis
+        cache = {}
+        mocker.patch("src.backend.routes.projects.get_cached_json", side_effect=cache.get)
+        mocker.patch("src.backend.routes.projects.set_cached_json", side_effect=lambda key, value, ttl: cache.__setitem__(key, value))
+        mocker.patch("src.backend.routes.projects.delete_cached", side_effect=lambda key: cache.pop(key, None))
+        
+        create_response = client.post("/projects/", json=sample_project_data)
+        project_id = create_response.json()["id"]
+        
+        # First read populates the cache
+        client.get(f"/projects/{project_id}")
+        assert cache[f"projects:{project_id}"]["name"] == sample_project_data["name"]
+        
+        # Updating drops the cached entry so the next read sees the change
+        client.put(f"/projects/{project_id}", json={"name": "Renamed Project"})
+        assert f"projects:{project_id}" not in cache
+        assert client.get(f"/projects/{project_id}").json()["name"] == "Renamed Project"
+    
+    def test_get_projects_cursor_pagination(self, client, sample_project_data):
+        """Test paging through projects with next_cursor until the last page"""
+        created_ids = [client.post("/projects/", json=sample_project_data).json()["id"] for _ in range(3)]
+        
+        seen_ids = []
+        params = {"limit": 2, "include_total": True}
+        while True:
+            response = client.get("/projects/", params=params)
+            assert response.status_code == status.HTTP_200_OK
+            data = response.json()
+            assert len(data["items"]) <= 2
+            seen_ids.extend(item["id"] for item in data["items"])
+            if data["next_cursor"] is None:
+                break
+            params["cursor"] = data["next_cursor"]
+        
+        assert seen_ids == sorted(set(seen_ids))
+        assert set(created_ids) <= set(seen_ids)
+        assert data["total_count"] == len(seen_ids)
+        
+        # skip is the fallback when no cursor is given
+        skipped = client.get("/projects/", params={"skip": 1, "limit": 2}).json()
+        assert [item["id"] for item in skipped["items"]] == seen_ids[1:3]
+        assert skipped["total_count"] is None
+    
+    def test_get_projects_invalid_cursor(self, client):
+        """Test that a malformed cursor is rejected"""
+        response = client.get("/projects/", params={"cursor": "not-a-cursor!"})
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == "Invalid cursor"
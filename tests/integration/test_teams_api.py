@@ -0,0 +1,42 @@
+import pytest
+from fastapi import status
+
+@pytest.mark.integration
+@pytest.mark.api
+class TestTeamsAPI:
+    """Integration tests for the Teams API"""
+
+    def test_get_teams_cursor_pagination(self, client):
+        """Test paging through teams with next_cursor until the last page"""
+        created_ids = [
+            client.post("/teams/", json={"name": f"Paged Team {i}", "description": "A test team"}).json()["id"]
+            for i in range(3)
+        ]
+
+        seen_ids = []
+        params = {"limit": 2, "include_total": True}
+        while True:
+            response = client.get("/teams/", params=params)
+            assert response.status_code == status.HTTP_200_OK
+            data = response.json()
+            assert len(data["items"]) <= 2
+            seen_ids.extend(item["id"] for item in data["items"])
+            if data["next_cursor"] is None:
+                break
+            params["cursor"] = data["next_cursor"]
+
+        assert seen_ids == sorted(set(seen_ids))
+        assert set(created_ids) <= set(seen_ids)
+        assert data["total_count"] == len(seen_ids)
+
+        # skip is the fallback when no cursor is given
+        skipped = client.get("/teams/", params={"skip": 1, "limit": 2}).json()
+        assert [item["id"] for item in skipped["items"]] == seen_ids[1:3]
+        assert skipped["total_count"] is None
+
+    def test_get_teams_invalid_cursor(self, client):
+        """Test that a malformed cursor is rejected"""
+        response = client.get("/teams/", params={"cursor": "not-a-cursor!"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == "Invalid cursor"
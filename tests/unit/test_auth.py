@@ -3,9 +3,14 @@ from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import jwk, jwt
+from passlib.context import CryptContext
 
 from src.backend.database import Base, get_db
 from src.backend.main import app
+from src.backend import auth
 from src.backend.auth import get_password_hash
 from src.models.user import User
 
@@ -215,4 +220,66 @@ def test_user_setup(client, test_user):
     assert data["company"] == setup_data["company"]
     assert data["role"] == setup_data["role"]
     assert data["team_size"] == setup_data["team_size"]
-    assert data["setup_complete"] is True 
\ No newline at end of file
+    assert data["setup_complete"] is True 
+
+# Test that a legacy bcrypt hash still logs in and is upgraded to argon2
+def test_login_rehashes_legacy_bcrypt_password(client):
+    db = TestingSessionLocal()
+    db_user = User(
+        email="legacy@example.com",
+        username="legacyuser",
+        hashed_password=CryptContext(schemes=["bcrypt"]).hash("password123"),
+        full_name="Legacy User"
+    )
+    db.add(db_user)
+    db.commit()
+    db.close()
+    
+    response = client.post(
+        "/auth/login",
+        json={
+            "email": "legacy@example.com",
+            "password": "password123"
+        }
+    )
+    assert response.status_code == 200
+    
+    db = TestingSessionLocal()
+    stored_hash = db.query(User).filter(User.email == "legacy@example.com").first().hashed_password
+    db.close()
+    assert stored_hash.startswith("$argon2id$")
+    assert auth.verify_password("password123", stored_hash)
+
+
+# Test that tokens signed with ES256 are accepted by protected endpoints
+def test_es256_token_roundtrip(client, test_user, monkeypatch):
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    monkeypatch.setattr(auth, "ALGORITHM", "ES256")
+    monkeypatch.setattr(auth, "_SIGNING_KEY", jwk.construct(private_pem, "ES256"))
+    monkeypatch.setattr(auth, "_VERIFY_KEY", jwk.construct(public_pem, "ES256"))
+    
+    login_response = client.post(
+        "/auth/login",
+        json={
+            "email": test_user["email"],
+            "password": test_user["password"]
+        }
+    )
+    token = login_response.json()["access_token"]
+    assert jwt.get_unverified_header(token)["alg"] == "ES256"
+    
+    response = client.get(
+        "/auth/me",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["email"] == test_user["email"]
@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+
+from src.backend.coalesce import coalesced, _inflight
+
+
+def test_concurrent_callers_share_one_computation():
+    """Test that concurrent callers for one key run compute() once"""
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": 42}
+
+    async def run():
+        return await asyncio.gather(*(coalesced("key", compute) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert results == [{"value": 42}] * 5
+    assert len(calls) == 1
+    assert "key" not in _inflight
+
+
+def test_exception_propagates_to_waiters_and_clears_key():
+    """Test that a failure reaches every waiter and frees the key"""
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        return await asyncio.gather(*(coalesced("key", compute) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert "key" not in _inflight
+
+
+def test_sequential_calls_recompute():
+    """Test that nothing is cached once the in-flight run finishes"""
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert asyncio.run(coalesced("key", compute)) == 1
+    assert asyncio.run(coalesced("key", compute)) == 2
+
+
+def test_leader_cancellation_does_not_cancel_waiters():
+    """Test that cancelling the caller that started the run leaves it running for the others"""
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": 42}
+
+    async def run():
+        leader = asyncio.ensure_future(coalesced("key", compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(coalesced("key", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(run()) == {"value": 42}
+    assert len(calls) == 1
+    assert "key" not in _inflight
@@ -72,6 +72,31 @@ class TestGitHubIntegration:
             assert "Could not access repository" in str(excinfo.value)
             mock_instance.get_repo.assert_called_once_with("invalid/repo")
     
+    def test_get_repositories_success(self):
+        """Test get_repositories lists repositories with GitHub's max page size"""
+        with patch('src.integrations.github_integration.Github') as mock_github:
+            mock_instance = MagicMock()
+            mock_github.return_value = mock_instance
+
+            mock_repo = MagicMock()
+            mock_repo.full_name = "owner/repo"
+            mock_repo.description = "Test repository"
+            mock_repo.private = True
+            mock_repo.html_url = "https://github.com/owner/repo"
+            mock_instance.get_user.return_value.get_repos.return_value = [mock_repo]
+
+            integration = GitHubIntegration(api_token="test_token")
+            result = integration.get_repositories()
+
+            assert mock_instance.per_page == 100
+            assert result == [{
+                "id": "owner/repo",
+                "name": "owner/repo",
+                "description": "Test repository",
+                "private": True,
+                "url": "https://github.com/owner/repo"
+            }]
+
     def test_get_pull_requests_no_repository(self):
         """Test get_pull_requests with no repository raises ValueError"""
         with patch('src.integrations.github_integration.Github'):
@@ -144,6 +169,34 @@ class TestGitHubIntegration:
             assert "created_at" in result.columns
             assert "merged_at" in result.columns
     
+    def test_get_pull_requests_stops_at_first_old_pr(self):
+        """Test get_pull_requests stops paging once PRs are older than the window"""
+        with patch('src.integrations.github_integration.Github') as mock_github:
+            mock_instance = MagicMock()
+            mock_github.return_value = mock_instance
+            mock_repo = MagicMock()
+            mock_instance.get_repo.return_value = mock_repo
+            
+            mock_pr_recent = MagicMock()
+            mock_pr_recent.number = 1
+            mock_pr_recent.created_at = datetime.now(timezone.utc) - timedelta(days=1)
+            mock_pr_old = MagicMock()
+            mock_pr_old.created_at = datetime.now(timezone.utc) - timedelta(days=60)
+            
+            consumed = []
+            def pulls():
+                # Stand-in for PyGithub's lazy paginator
+                for pr in [mock_pr_recent, mock_pr_old, MagicMock()]:
+                    consumed.append(pr)
+                    yield pr
+            mock_repo.get_pulls.return_value = pulls()
+            
+            integration = GitHubIntegration(api_token="test_token", repository="owner/repo")
+            result = integration.get_pull_requests(days=30)
+            
+            assert list(result["id"]) == [1]
+            assert consumed == [mock_pr_recent, mock_pr_old]
+    
     def test_get_commits_success(self):
         """Test get_commits returns correct DataFrame"""
         with patch('src.integrations.github_integration.Github') as mock_github:
@@ -247,7 +300,12 @@ class TestGitHubIntegration:
             result = integration.get_issues(days=30)
             
             # Assertions
-            mock_repo.get_issues.assert_called_once_with(state="all", sort="created", direction="desc")
+            mock_repo.get_issues.assert_called_once()
+            call_kwargs = mock_repo.get_issues.call_args.kwargs
+            assert call_kwargs["state"] == "all"
+            assert call_kwargs["sort"] == "created"
+            assert call_kwargs["direction"] == "desc"
+            assert call_kwargs["since"] <= datetime.now(timezone.utc) - timedelta(days=30)
             assert isinstance(result, pd.DataFrame)
             assert len(result) == 2  # PR and old issue should be filtered out
             assert result.iloc[0]["id"] == 1
@@ -329,6 +387,9 @@ class TestGitHubIntegration:
                 assert result['issue_count'] == 3
                 assert 'issue_close_rate' in result
                 assert result['issue_close_rate'] == 1/3  # 1 out of 3 issues closed
+                # Each merged PR took a day; the closed issue took five
+                assert result['avg_time_to_merge_hours'] == pytest.approx(24, abs=0.01)
+                assert result['avg_time_to_close_hours'] == pytest.approx(120, abs=0.01)
     
     def test_calculate_metrics_inactive_repo(self):
         """Test calculate_metrics with inactive repository"""
@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import MagicMock
 from src.integrations.integration_factory import IntegrationFactory
 from src.integrations.github_integration import GitHubIntegration
 from src.integrations.jira_integration import JiraIntegration
@@ -60,6 +61,21 @@ class TestIntegrationFactory:
         # Verify the error message
         assert str(exc_info.value) == "Unsupported integration type: unsupported"
     
+    def test_get_metrics_dispatches_on_integration_class(self):
+        """Test get_metrics routes each integration class to its calculate_metrics call"""
+        trello = MagicMock(spec=TrelloIntegration)
+        trello.calculate_metrics.return_value = {"open_card_count": 2}
+        # spec'd mocks aren't the exact class, so this also covers the isinstance fallback
+        assert IntegrationFactory.get_metrics(trello, {"board_id": "b1", "days": 7}) == {"open_card_count": 2}
+        trello.calculate_metrics.assert_called_once_with(board_id="b1", days=7)
+        
+        jira = MagicMock(spec=JiraIntegration)
+        with pytest.raises(ValueError, match="project_key is required for Jira metrics"):
+            IntegrationFactory.get_metrics(jira, {})
+        
+        with pytest.raises(ValueError, match="Unsupported integration type"):
+            IntegrationFactory.get_metrics(object())
+    
     def test_get_supported_metrics_github(self):
         """Test getting supported metrics for GitHub"""
         # Get supported metrics
@@ -98,4 +114,21 @@ class TestIntegrationFactory:
             IntegrationFactory.get_supported_metrics("unsupported")
         
         # Verify the error message
-        assert str(exc_info.value) == "Unsupported integration type: unsupported" 
\ No newline at end of file
+        assert str(exc_info.value) == "Unsupported integration type: unsupported"
+    
+    def test_get_or_create_integration_reuses_instance(self):
+        """Test that instances are cached per type and config until evicted"""
+        config = {"api_key": "cache_key", "token": "cache_token"}
+        
+        first = IntegrationFactory.get_or_create_integration("trello", config, integration_id=42)
+        second = IntegrationFactory.get_or_create_integration("Trello", dict(config), integration_id=42)
+        assert first is second
+        
+        # A different config gets its own instance
+        other = IntegrationFactory.get_or_create_integration("trello", {"api_key": "other_key", "token": "cache_token"})
+        assert other is not first
+        
+        # Evicting by integration ID forces a fresh instance
+        IntegrationFactory.evict_integration(42)
+        third = IntegrationFactory.get_or_create_integration("trello", config, integration_id=42)
+        assert third is not first
@@ -1,4 +1,7 @@
 import json
+import logging
+import orjson
+from datetime import datetime
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -6,7 +9,18 @@ from unittest.mock import patch, MagicMock
 import redis # Import for redis.exceptions
 
 # Import the decorator and the client it uses
-from src.integrations.cache import redis_cache, redis_client as actual_redis_client
+from src.integrations.cache import (
+    redis_cache,
+    redis_client as actual_redis_client,
+    get_cached_json,
+    get_cached_json_many,
+    set_cached_json,
+    set_cached_json_many,
+    get_cached_bytes,
+    set_cached_bytes,
+    invalidate_cache_prefix,
+    delete_cached,
+)
 
 # Store the original redis_client and restore it after tests if necessary,
 # or ensure mocks are properly scoped. For module-level client, patching is safer.
@@ -115,7 +129,7 @@ def test_cache_miss_no_args(mock_redis_client_fixture):
     mock_redis_client_fixture.setex.assert_called_once_with(
         expected_key_no_args,
         3600,
-        json.dumps({"data": "result_no_args_method"})
+        orjson.dumps({"data": "result_no_args_method"})
     )
 
 def test_cache_hit_no_args(mock_redis_client_fixture):
@@ -169,7 +183,7 @@ def test_cache_miss_with_args_kwargs(mock_redis_client_fixture):
     mock_redis_client_fixture.setex.assert_called_once_with(
         expected_key,
         1800,
-        json.dumps({"data": "result_method_test_arg_val_60"})
+        orjson.dumps({"data": "result_method_test_arg_val_60"})
     )
 
 def test_cache_miss_with_args_positional_days(mock_redis_client_fixture):
@@ -195,7 +209,7 @@ def test_cache_miss_with_args_positional_days(mock_redis_client_fixture):
     mock_redis_client_fixture.setex.assert_called_once_with(
         expected_key,
         1800,
-        json.dumps({"data": "result_method_test_arg_pos_val_70"})
+        orjson.dumps({"data": "result_method_test_arg_pos_val_70"})
     )
 
 
@@ -208,7 +222,7 @@ def test_cache_key_generation_github_kwargs(mock_redis_client_fixture):
     expected_key_gh = "MockGitHubIntegration:calculate_metrics:repository_name:my/repo_gh_kwargs:days:90"
     mock_redis_client_fixture.get.assert_called_with(expected_key_gh)
     mock_redis_client_fixture.setex.assert_called_with(
-        expected_key_gh, 60, json.dumps({"repo": "my/repo_gh_kwargs", "days": 90, "metric": "gh_metric"})
+        expected_key_gh, 60, orjson.dumps({"repo": "my/repo_gh_kwargs", "days": 90, "metric": "gh_metric"})
     )
 
 def test_cache_key_generation_github_pos_args(mock_redis_client_fixture):
@@ -219,7 +233,7 @@ def test_cache_key_generation_github_pos_args(mock_redis_client_fixture):
     expected_key_gh_default = "MockGitHubIntegration:calculate_metrics:repository_name:my/repo_gh_pos:days:15"
     mock_redis_client_fixture.get.assert_called_with(expected_key_gh_default)
     mock_redis_client_fixture.setex.assert_called_with(
-        expected_key_gh_default, 60, json.dumps({"repo": "my/repo_gh_pos", "days": 15, "metric": "gh_metric"})
+        expected_key_gh_default, 60, orjson.dumps({"repo": "my/repo_gh_pos", "days": 15, "metric": "gh_metric"})
     )
 
 
@@ -232,7 +246,7 @@ def test_cache_key_generation_jira_kwargs(mock_redis_client_fixture):
     expected_key_jira = "MockJiraIntegration:calculate_metrics:project_key:PROJ_KW:days:45" 
     mock_redis_client_fixture.get.assert_called_with(expected_key_jira)
     mock_redis_client_fixture.setex.assert_called_with(
-        expected_key_jira, 60, json.dumps({"project": "PROJ_KW", "days": 45, "metric": "jira_metric"})
+        expected_key_jira, 60, orjson.dumps({"project": "PROJ_KW", "days": 45, "metric": "jira_metric"})
     )
 
 def test_cache_key_generation_jira_pos_args(mock_redis_client_fixture):
@@ -243,7 +257,7 @@ def test_cache_key_generation_jira_pos_args(mock_redis_client_fixture):
     expected_key_jira = "MockJiraIntegration:calculate_metrics:project_key:PROJ_POS_JIRA:days:25" 
     mock_redis_client_fixture.get.assert_called_with(expected_key_jira)
     mock_redis_client_fixture.setex.assert_called_with(
-        expected_key_jira, 60, json.dumps({"project": "PROJ_POS_JIRA", "days": 25, "metric": "jira_metric"})
+        expected_key_jira, 60, orjson.dumps({"project": "PROJ_POS_JIRA", "days": 25, "metric": "jira_metric"})
     )
 
 
@@ -255,7 +269,7 @@ def test_cache_key_generation_trello_kwargs(mock_redis_client_fixture):
     expected_key_trello = "MockTrelloIntegration:calculate_metrics:board_id:BOARDX_KW:days:15"
     mock_redis_client_fixture.get.assert_called_with(expected_key_trello)
     mock_redis_client_fixture.setex.assert_called_with(
-        expected_key_trello, 60, json.dumps({"board": "BOARDX_KW", "days": 15, "metric": "trello_metric"})
+        expected_key_trello, 60, orjson.dumps({"board": "BOARDX_KW", "days": 15, "metric": "trello_metric"})
     )
 
 def test_cache_key_generation_trello_pos_args(mock_redis_client_fixture):
@@ -266,7 +280,7 @@ def test_cache_key_generation_trello_pos_args(mock_redis_client_fixture):
     expected_key_trello = "MockTrelloIntegration:calculate_metrics:board_id:BOARDY_POS:days:5"
     mock_redis_client_fixture.get.assert_called_with(expected_key_trello)
     mock_redis_client_fixture.setex.assert_called_with(
-        expected_key_trello, 60, json.dumps({"board": "BOARDY_POS", "days": 5, "metric": "trello_metric"})
+        expected_key_trello, 60, orjson.dumps({"board": "BOARDY_POS", "days": 5, "metric": "trello_metric"})
     )
 
 
@@ -317,6 +331,7 @@ def test_redis_client_disabled(caplog): # No mock_redis_client_fixture needed he
             self.call_count+=1
             return "data_disabled"
     
+    caplog.set_level(logging.DEBUG, logger="src.integrations.cache")
     test_instance = DummyTestClassDisabled()
     result = test_instance.disabled_test_method()
 
@@ -345,6 +360,7 @@ class LoggingTestClass:
         return "log_data"
 
 def test_cache_hit_logging(mock_redis_client_fixture, caplog):
+    caplog.set_level(logging.DEBUG, logger="src.integrations.cache")
     instance = LoggingTestClass()
     cached_value = json.dumps("log_data_cached")
     # Expected key: ClassName:FuncName
@@ -355,6 +371,7 @@ def test_cache_hit_logging(mock_redis_client_fixture, caplog):
     assert f"Cache hit for key: {expected_key}" in caplog.text
 
 def test_cache_miss_logging(mock_redis_client_fixture, caplog):
+    caplog.set_level(logging.DEBUG, logger="src.integrations.cache")
     instance = LoggingTestClass()
     mock_redis_client_fixture.get.return_value = None
     expected_key = "LoggingTestClass:logging_method"
@@ -377,5 +394,75 @@ def test_custom_ttl(mock_redis_client_fixture):
     mock_redis_client_fixture.setex.assert_called_once_with(
         expected_key,
         5, # Expected TTL
-        json.dumps("short_lived_method")
+        orjson.dumps("short_lived_method")
     )
+
+
+# Tests for the response cache helpers
+def test_get_cached_json_hit_and_miss(mock_redis_client_fixture):
+    mock_redis_client_fixture.get.return_value = json.dumps({"total_count": 1})
+    assert get_cached_json("integrations:list") == {"total_count": 1}
+
+    mock_redis_client_fixture.get.return_value = None
+    assert get_cached_json("integrations:list") is None
+
+def test_get_cached_json_many(mock_redis_client_fixture):
+    mock_redis_client_fixture.mget.return_value = [json.dumps({"id": 1}), None]
+    assert get_cached_json_many(["integrations:metrics:1:", "integrations:metrics:2:"]) == [{"id": 1}, None]
+    mock_redis_client_fixture.mget.assert_called_once_with(["integrations:metrics:1:", "integrations:metrics:2:"])
+
+def test_set_cached_json(mock_redis_client_fixture):
+    set_cached_json("integrations:list", {"total_count": 1}, 30)
+    mock_redis_client_fixture.setex.assert_called_once_with(
+        "integrations:list", 30, orjson.dumps({"total_count": 1})
+    )
+
+def test_set_cached_json_serializes_datetimes_and_int_keys(mock_redis_client_fixture):
+    set_cached_json("teams:metrics:1", {1: datetime(2024, 1, 2, 3, 4, 5)}, 30)
+    mock_redis_client_fixture.setex.assert_called_once_with(
+        "teams:metrics:1", 30, b'{"1":"2024-01-02T03:04:05"}'
+    )
+
+def test_set_cached_json_skips_unserializable(mock_redis_client_fixture):
+    set_cached_json("integrations:list", {"value": object()}, 30)
+    mock_redis_client_fixture.setex.assert_not_called()
+
+def test_set_cached_json_many_pipelines_writes(mock_redis_client_fixture):
+    pipe = mock_redis_client_fixture.pipeline.return_value
+    set_cached_json_many({"integrations:metrics:1:": {"id": 1}, "integrations:metrics:2:": {"value": object()}}, 30)
+    mock_redis_client_fixture.pipeline.assert_called_once_with(transaction=False)
+    # The unserializable value is skipped; the rest go out in one execute
+    pipe.setex.assert_called_once_with("integrations:metrics:1:", 30, orjson.dumps({"id": 1}))
+    pipe.execute.assert_called_once()
+    mock_redis_client_fixture.setex.assert_not_called()
+
+def test_cached_bytes_round_trip_without_decoding(mock_redis_client_fixture):
+    set_cached_bytes("teams:metrics:1", b'{"team_id":1}', 30)
+    mock_redis_client_fixture.setex.assert_called_once_with("teams:metrics:1", 30, b'{"team_id":1}')
+
+    mock_redis_client_fixture.get.return_value = b'{"team_id":1}'
+    assert get_cached_bytes("teams:metrics:1") == b'{"team_id":1}'
+
+    mock_redis_client_fixture.get.return_value = None
+    assert get_cached_bytes("teams:metrics:1") is None
+
+def test_invalidate_cache_prefix(mock_redis_client_fixture):
+    mock_redis_client_fixture.scan_iter.return_value = iter([b"integrations:list", b"integrations:metrics:1"])
+    invalidate_cache_prefix("integrations:")
+    mock_redis_client_fixture.scan_iter.assert_called_once_with(match="integrations:*")
+    mock_redis_client_fixture.delete.assert_called_once_with(b"integrations:list", b"integrations:metrics:1")
+
+def test_delete_cached(mock_redis_client_fixture):
+    delete_cached("projects:count")
+    mock_redis_client_fixture.delete.assert_called_once_with("projects:count")
+
+def test_response_cache_helpers_without_redis(mocker):
+    mocker.patch('src.integrations.cache.redis_client', new=None)
+    assert get_cached_json("integrations:list") is None
+    assert get_cached_json_many(["integrations:list"]) == [None]
+    assert get_cached_bytes("integrations:list") is None
+    set_cached_bytes("integrations:list", b"{}", 30)
+    set_cached_json_many({"integrations:list": {"total_count": 1}}, 30)
+    set_cached_json("integrations:list", {"total_count": 1}, 30)
+    invalidate_cache_prefix("integrations:")
+    delete_cached("projects:count")
@@ -56,6 +56,43 @@ def alter_table_add_column(table_name, column_name, column_type, nullable=True,
         else:
             print(f"Column {column_name} already exists in {table_name}")
 
+def create_index(index_name, table_name, columns):
+    """Create an index if it doesn't exist"""
+    
+    with engine.connect() as conn:
+        print(f"Ensuring index {index_name} on {table_name} ({', '.join(columns)})...")
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({', '.join(columns)});"))
+        conn.commit()
+
+def drop_index(index_name):
+    """Drop an index if it exists"""
+    
+    with engine.connect() as conn:
+        print(f"Dropping index {index_name} if present...")
+        conn.execute(text(f"DROP INDEX IF EXISTS {index_name};"))
+        conn.commit()
+
+def backfill_integration_team_ids():
+    """Set team_id on legacy integrations that only stored the team in project_id"""
+    
+    with engine.connect() as conn:
+        print("Backfilling integrations.team_id from project_id...")
+        result = conn.execute(text("""
+        UPDATE integrations SET team_id = project_id
+        WHERE team_id IS NULL AND project_id IN (SELECT id FROM teams);
+        """))
+        conn.commit()
+        print(f"Backfilled team_id on {result.rowcount} integrations")
+
+def normalize_integration_types():
+    """Lowercase integrations.type on legacy rows; the API stores types lowercased"""
+    
+    with engine.connect() as conn:
+        print("Normalizing integrations.type to lowercase...")
+        result = conn.execute(text("UPDATE integrations SET type = LOWER(type) WHERE type <> LOWER(type);"))
+        conn.commit()
+        print(f"Normalized type on {result.rowcount} integrations")
+
 def main():
     """Main function to run migrations"""
     print("Starting database migrations...")
@@ -65,6 +102,19 @@ def main():
     
     # Add team_id to integrations
     alter_table_add_column("integrations", "team_id", "INTEGER", nullable=True, foreign_key="teams(id)")
+    backfill_integration_team_ids()
+    normalize_integration_types()
+    
+    # Indexes for the project/team-scoped integration and metric queries
+    create_index("ix_integration_type_project", "integrations", ["type", "project_id"])
+    create_index("ix_integration_project_active", "integrations", ["project_id", "active"])
+    create_index("ix_integration_team_active", "integrations", ["team_id", "active"])
+    create_index("ix_metric_project_team", "metrics", ["project_id", "team_id"])
+    create_index("ix_metrics_team_id", "metrics", ["team_id"])
+    # Superseded by ix_integration_project_active, which leads with the same column
+    drop_index("ix_integration_project_id_id")
+    # get_projects seeks on the primary key alone, so (active, id) served no query
+    drop_index("ix_project_active_id")
     
     print("Database migrations completed!")
 